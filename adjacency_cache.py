@@ -0,0 +1,345 @@
+# adjacency_cache.py
+"""
+Memory-bounded cache of FOLLOWS neighborhoods.
+
+Follower, following and friend-of-friend lookups keep touching the same
+popular students. ``AdjacencyCache`` keeps each cached neighbor list as a
+sorted ``array('I')`` of interned student numbers, 4 bytes per neighbor
+instead of a Python string per neighbor. An ``IdInterner`` maps those
+numbers back to student ids and names. ``max_bytes`` bounds the arrays and
+that table together: once they pass it, entries are evicted in LRU order and
+the table is compacted down to the students the remaining entries mention.
+
+Follow and delete events update cached entries in place (write-through), so a
+worker always sees its own writes. Writes handled by other gunicorn workers
+reach this cache only when an entry expires (``ttl``) or is refreshed. Reads
+from clients that carry bookmarks from a recent write always refresh, so
+those clients still read their own writes.
+
+Loaders passed to ``neighbors`` and ``friends_of_friends`` take a list of
+student ids and return ``{student_id: [(neighbor_id, name), ...]}``, with no
+entry for students that do not exist.
+"""
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+
+FOLLOWING = 'following'
+FOLLOWERS = 'followers'
+
+# Approximate bytes per entry on top of its array: key tuple, value tuple, LRU links
+ENTRY_OVERHEAD = 120
+
+# Approximate bytes per interned student on top of its strings: dict slot, list slots, int
+STUDENT_OVERHEAD = 100
+
+# Fraction of max_bytes eviction frees up front, so compactions stay rare
+EVICTION_SLACK = 0.25
+
+
+class IdInterner:
+    """Two-way mapping between student ids and small integers, plus display names."""
+
+    def __init__(self):
+        self._numbers = {}
+        self._ids = []
+        self._names = []
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    @staticmethod
+    def _name_bytes(name):
+        return sys.getsizeof(name) if name is not None else 0
+
+    def intern(self, student_id, name=None):
+        number = self._numbers.get(student_id)
+        if number is None:
+            number = self._numbers[student_id] = len(self._ids)
+            self._ids.append(student_id)
+            self._names.append(name)
+            self.bytes += sys.getsizeof(student_id) + self._name_bytes(name) + STUDENT_OVERHEAD
+        elif name is not None:
+            self.bytes += self._name_bytes(name) - self._name_bytes(self._names[number])
+            self._names[number] = name
+        return number
+
+    def lookup(self, student_id):
+        return self._numbers.get(student_id)
+
+    def student(self, number):
+        return self._ids[number], self._names[number]
+
+    def has_name(self, number):
+        return self._names[number] is not None
+
+    def compact(self, keep):
+        """
+        Forget every student not in ``keep`` and renumber the rest.
+
+        Numbers keep their relative order, so sorted arrays stay sorted.
+
+        Returns:
+            dict: Old number -> new number for the kept students
+        """
+        remap = {}
+        ids, names = self._ids, self._names
+        self.__init__()
+        for old in sorted(keep):
+            remap[old] = self.intern(ids[old], names[old])
+        return remap
+
+
+class AdjacencyCache:
+    """
+    LRU cache of FOLLOWING and FOLLOWERS lists, bounded by bytes.
+
+    Args:
+        max_bytes (int): Budget for cached neighbor arrays and the student table
+        ttl (float): Seconds before an entry is reloaded
+    """
+
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=300):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._interner = IdInterner()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.oversized = 0
+        self.compactions = 0
+
+    @staticmethod
+    def _size(neighbors):
+        return sys.getsizeof(neighbors) + ENTRY_OVERHEAD
+
+    def _drop(self, key):
+        neighbors, _ = self._entries.pop(key)
+        self._bytes -= self._size(neighbors)
+
+    def _compact(self):
+        """Drop students no entry mentions from the table and renumber the entries."""
+        keep = set()
+        for (_, number), (neighbors, _) in self._entries.items():
+            keep.add(number)
+            keep.update(neighbors)
+        remap = self._interner.compact(keep)
+        self._entries = OrderedDict(
+            ((direction, remap[number]), (array('I', [remap[n] for n in neighbors]), expires))
+            for (direction, number), (neighbors, expires) in self._entries.items())
+        self.compactions += 1
+
+    def _enforce_budget(self):
+        """Evict LRU entries and compact the table until both fit in ``max_bytes``."""
+        while self._bytes + self._interner.bytes > self.max_bytes:
+            self._compact()
+            if self._bytes + self._interner.bytes <= self.max_bytes:
+                return
+            # Evicting only frees table space at the next compaction; free
+            # some slack now so that does not happen on every put
+            target = self.max_bytes * (1 - EVICTION_SLACK) - self._interner.bytes
+            while self._entries and self._bytes > max(target, 0):
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+            if not self._entries:
+                self._compact()
+                return
+
+    def _cached(self, direction, student_id):
+        """Sorted neighbor array for a live entry, marking it recently used; None on a miss."""
+        number = self._interner.lookup(student_id)
+        key = (direction, number)
+        entry = self._entries.get(key) if number is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[1] <= time.monotonic():
+            self._drop(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def get(self, student_id, direction):
+        """
+        Cached neighbors of a student.
+
+        Returns:
+            list: ``(student_id, name)`` pairs, or None if not cached
+        """
+        with self._lock:
+            neighbors = self._cached(direction, student_id)
+            if neighbors is None:
+                return None
+            return [self._interner.student(number) for number in neighbors]
+
+    def put(self, student_id, direction, neighbors):
+        """
+        Cache the full neighbor list of a student.
+
+        Args:
+            student_id (str): Student whose list this is
+            direction (str): FOLLOWING or FOLLOWERS
+            neighbors (iterable): ``(student_id, name)`` pairs
+
+        Returns:
+            bool: False if the list is too large to cache
+        """
+        with self._lock:
+            interned = self._interner.bytes
+            numbers = sorted({self._interner.intern(sid, name) for sid, name in neighbors})
+            packed = array('I', numbers)
+            key = (direction, self._interner.intern(student_id))
+            size = self._size(packed)
+            if key in self._entries:
+                self._drop(key)
+            # One hub must not flush everything else out of the cache
+            if size + self._interner.bytes - interned > self.max_bytes // 4:
+                self.oversized += 1
+                self._enforce_budget()
+                return False
+            self._entries[key] = (packed, time.monotonic() + self.ttl)
+            self._bytes += size
+            self._enforce_budget()
+            return True
+
+    def _insert(self, key, number):
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+        neighbors = entry[0]
+        position = bisect_left(neighbors, number)
+        if position < len(neighbors) and neighbors[position] == number:
+            return
+        self._bytes -= self._size(neighbors)
+        neighbors.insert(position, number)
+        self._bytes += self._size(neighbors)
+
+    def add_follow(self, follower_id, followee_id, follower_name=None, followee_name=None):
+        """Write-through for a new FOLLOWS edge."""
+        with self._lock:
+            follower = self._interner.lookup(follower_id)
+            followee = self._interner.lookup(followee_id)
+            # Students no entry lists are not interned; there is nothing to update
+            updates = [(key, neighbor_id, neighbor_name) for key, neighbor_id, neighbor_name in (
+                ((FOLLOWING, follower), followee_id, followee_name),
+                ((FOLLOWERS, followee), follower_id, follower_name)) if key in self._entries]
+            for key, neighbor_id, neighbor_name in updates:
+                number = self._interner.intern(neighbor_id, neighbor_name)
+                if self._interner.has_name(number):
+                    self._insert(key, number)
+                else:
+                    # Nothing to render the new neighbor with; reload the list instead
+                    self._drop(key)
+            self._enforce_budget()
+
+    def remove_student(self, student_id):
+        """Write-through for a deleted student: drop its lists and remove it from others."""
+        with self._lock:
+            number = self._interner.lookup(student_id)
+            if number is None:
+                return
+            for direction in (FOLLOWING, FOLLOWERS):
+                if (direction, number) in self._entries:
+                    self._drop((direction, number))
+            for neighbors, _ in self._entries.values():
+                position = bisect_left(neighbors, number)
+                if position < len(neighbors) and neighbors[position] == number:
+                    self._bytes -= self._size(neighbors)
+                    del neighbors[position]
+                    self._bytes += self._size(neighbors)
+
+    def neighbors(self, student_id, direction, load, refresh=False):
+        """
+        Neighbors of a student, loading and caching them on a miss.
+
+        Args:
+            student_id (str): Student to look up
+            direction (str): FOLLOWING or FOLLOWERS
+            load (callable): Loader for this direction
+            refresh (bool): Reload even if cached
+
+        Returns:
+            list: ``(student_id, name)`` pairs; empty for an unknown student
+        """
+        if not refresh:
+            cached = self.get(student_id, direction)
+            if cached is not None:
+                return cached
+        loaded = load([student_id]).get(student_id)
+        if loaded is None:
+            return []
+        self.put(student_id, direction, loaded)
+        return loaded
+
+    def friends_of_friends(self, student_id, load, refresh=False):
+        """
+        Students followed by the people a student follows, excluding the
+        student and everyone they already follow.
+
+        Args:
+            student_id (str): Student to suggest friends for
+            load (callable): FOLLOWING loader, called at most twice
+            refresh (bool): Reload even if cached
+
+        Returns:
+            list: ``(student_id, name)`` pairs
+        """
+        friends = [sid for sid, _ in self.neighbors(student_id, FOLLOWING, load, refresh)]
+        lists = {}
+        missing = []
+        for friend in friends:
+            cached = None if refresh else self.get(friend, FOLLOWING)
+            if cached is None:
+                missing.append(friend)
+            else:
+                lists[friend] = cached
+        if missing:
+            loaded = load(missing)
+            for friend in missing:
+                lists[friend] = loaded.get(friend)
+                # Only cache students the loader found
+                if lists[friend] is None:
+                    lists[friend] = []
+                else:
+                    self.put(friend, FOLLOWING, lists[friend])
+
+        excluded = set(friends)
+        excluded.add(student_id)
+        suggested = {}
+        for friend in friends:
+            for sid, name in lists[friend]:
+                if sid not in excluded and sid not in suggested:
+                    suggested[sid] = name
+        return list(suggested.items())
+
+    def metrics(self):
+        """Hit rate, evictions and memory use."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes + self._interner.bytes,
+                'max_bytes': self.max_bytes,
+                'array_bytes': self._bytes,
+                'interned_students': len(self._interner),
+                'interner_bytes': self._interner.bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'oversized': self.oversized,
+                'compactions': self.compactions,
+                'ttl_seconds': self.ttl,
+            }
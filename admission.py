@@ -0,0 +1,231 @@
+# admission.py
+"""
+Admission control for expensive endpoints.
+
+``AdmissionController.limit`` wraps a route with three layers, cheapest first:
+
+1. A per-client token bucket. Every route has a cost weight, so one schema
+   dump drains as many tokens as many point lookups do.
+2. Request coalescing. Identical requests already in flight wait for the
+   leader's response instead of issuing their own DB execution. Requests
+   only coalesce if they carry the same causal-consistency bookmarks.
+3. A concurrency cap on heavy routes. Excess requests wait in a bounded queue
+   and receive a 503 if no slot frees up before the queue timeout.
+
+Token buckets live in a ``BucketStore``. ``InMemoryBucketStore`` is per
+process; a shared implementation (Redis, memcached, ...) only needs to provide
+``consume`` with the same semantics to rate-limit across gunicorn workers.
+"""
+import logging
+import threading
+import time
+from functools import wraps
+
+from flask import current_app, g, jsonify, request
+
+
+class BucketStore:
+    """Interface for token bucket storage."""
+
+    def consume(self, key, cost, rate, capacity):
+        """
+        Take ``cost`` tokens from the bucket for ``key`` if it holds enough.
+
+        Args:
+            key (str): Client identifier
+            cost (float): Tokens this request needs
+            rate (float): Refill rate in tokens per second
+            capacity (float): Bucket size (maximum burst)
+
+        Returns:
+            float: 0 if the request is admitted, otherwise seconds until the
+            bucket holds enough tokens
+        """
+        raise NotImplementedError
+
+
+class InMemoryBucketStore(BucketStore):
+    """Process-local token buckets, pruned when the client table grows large."""
+
+    def __init__(self, max_clients=10000):
+        self._buckets = {}
+        self._lock = threading.Lock()
+        self._max_clients = max_clients
+
+    def consume(self, key, cost, rate, capacity):
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            if tokens >= cost:
+                self._buckets[key] = (tokens - cost, now)
+                retry_after = 0.0
+            else:
+                self._buckets[key] = (tokens, now)
+                retry_after = (cost - tokens) / rate if rate > 0 else float('inf')
+            if len(self._buckets) > self._max_clients:
+                self._prune(now, rate, capacity)
+        return retry_after
+
+    def _prune(self, now, rate, capacity):
+        """Forget clients whose buckets have refilled; they are indistinguishable from new ones."""
+        full = [key for key, (tokens, updated) in self._buckets.items()
+                if tokens + (now - updated) * rate >= capacity]
+        for key in full:
+            del self._buckets[key]
+
+
+class _Flight:
+    """One in-flight execution that followers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class RequestCoalescer:
+    """Share one execution among identical concurrent calls (single-flight)."""
+
+    def __init__(self):
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def run(self, key, fn):
+        """
+        Run ``fn`` unless a call with the same key is already running, in
+        which case wait for it and return its result.
+
+        Returns:
+            tuple: (result, shared) where shared is True for followers
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = fn()
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+
+class AdmissionController:
+    """
+    Rate limiting, concurrency capping and coalescing for Flask routes.
+
+    Args:
+        store (BucketStore): Token bucket storage
+        rate (float): Tokens refilled per client per second
+        burst (float): Bucket capacity per client
+        max_heavy (int): Heavy requests allowed to execute at once
+        max_queue (int): Heavy requests allowed to wait for a slot
+        queue_timeout (float): Seconds a heavy request waits before a 503
+        scope (callable): Returns a key that partitions coalescing, e.g. the
+            tenant, so identical URLs for different tenants never share a result
+    """
+
+    def __init__(self, store=None, rate=10.0, burst=40.0, max_heavy=4,
+                 max_queue=32, queue_timeout=5.0, scope=None):
+        self.store = store or InMemoryBucketStore()
+        self.rate = rate
+        self.burst = burst
+        self.queue_timeout = queue_timeout
+        self.max_queue = max_queue
+        self.scope = scope
+        self.coalescer = RequestCoalescer()
+        self._heavy_slots = threading.BoundedSemaphore(max_heavy)
+        self._waiting = 0
+        self._waiting_lock = threading.Lock()
+
+    def client_key(self):
+        """
+        Identify the client for rate limiting purposes.
+
+        Behind a proxy this is only the client's address if the app trusts
+        the proxy's ``X-Forwarded-For`` (``ProxyFix``); otherwise every client
+        shares the proxy's bucket.
+        """
+        return request.remote_addr or 'unknown'
+
+    def limit(self, cost=1, heavy=False, coalesce=False):
+        """
+        Decorate a route with admission control.
+
+        Args:
+            cost (float): Tokens charged per request
+            heavy (bool): Count the route against the concurrency cap
+            coalesce (bool): Share execution among identical in-flight requests
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                retry_after = self.store.consume(self.client_key(), cost, self.rate, self.burst)
+                if retry_after > 0:
+                    response = jsonify({'error': 'Rate limit exceeded',
+                                        'retry_after': round(retry_after, 2)})
+                    response.headers['Retry-After'] = str(max(1, int(retry_after + 0.999)))
+                    return response, 429
+
+                def execute():
+                    return self._execute(view, heavy, args, kwargs)
+
+                if coalesce:
+                    # A client with bookmarks must not share a read started
+                    # before its own write reached the replica
+                    key = (self.scope() if self.scope else None, request.endpoint, request.full_path,
+                           tuple(sorted(g.get('bookmarks') or ())))
+                    frozen, shared = self.coalescer.run(key, execute)
+                    if shared:
+                        logging.debug(f"Coalesced request for {request.full_path}")
+                else:
+                    frozen = execute()
+                body, status, headers = frozen
+                return current_app.response_class(body, status=status, headers=headers)
+            return wrapper
+        return decorator
+
+    def _execute(self, view, heavy, args, kwargs):
+        """Run the view, under the heavy-route cap if needed, and freeze its response."""
+        if heavy:
+            if not self._acquire_heavy_slot():
+                response = jsonify({'error': 'Server busy, try again later'})
+                response.status_code = 503
+                response.headers['Retry-After'] = str(max(1, int(self.queue_timeout)))
+                return self._freeze(response)
+            try:
+                return self._freeze(current_app.make_response(view(*args, **kwargs)))
+            finally:
+                self._heavy_slots.release()
+        return self._freeze(current_app.make_response(view(*args, **kwargs)))
+
+    def _acquire_heavy_slot(self):
+        if self._heavy_slots.acquire(blocking=False):
+            return True
+        with self._waiting_lock:
+            if self._waiting >= self.max_queue:
+                return False
+            self._waiting += 1
+        try:
+            return self._heavy_slots.acquire(timeout=self.queue_timeout)
+        finally:
+            with self._waiting_lock:
+                self._waiting -= 1
+
+    @staticmethod
+    def _freeze(response):
+        """Reduce a response to immutable parts so followers get their own copy."""
+        return response.get_data(), response.status_code, list(response.headers.items())
@@ -1,13 +1,28 @@
 # app.py
-from flask import Flask, request, jsonify, render_template
+from flask import Flask, Response, g, request, jsonify, render_template
 from flask_cors import CORS
-from db_connector import Neo4jConnection
+from werkzeug.middleware.proxy_fix import ProxyFix
+from graph_search import SearchBudget, cypher_neighbors, shortest_path, mutual_connections
+from serialization import Neo4jJSONProvider
+import assets
+from admission import AdmissionController
+from trending import TrendingEngine, TRENDING_KINDS
+import events
+from events import EventBus, EventLog
+from recommendations import RecommendationEngine
+from scheduler import Scheduler
+from adjacency_cache import AdjacencyCache, FOLLOWING, FOLLOWERS
+from warmup import Warmer
+import jobs
+import queries
+import tenancy
+import warmup
+import consistency
+from consistency import RequestBookmarks
+from tenancy import TenantRegistry, TenantRoutedConnection, TenantScoped
 import logging
 import os
 from dotenv import load_dotenv
-import json
-from datetime import datetime
-from neo4j.time import DateTime, Date, Time
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,35 +30,18 @@ load_dotenv()
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 
-# JSON serialization helper for Neo4j objects
-def neo4j_json_serializer(obj):
-    """Custom JSON serializer for Neo4j objects"""
-    if isinstance(obj, (DateTime, Date, Time)):
-        return obj.iso_format()
-    elif isinstance(obj, datetime):
-        return obj.isoformat()
-    elif hasattr(obj, '__dict__'):
-        return obj.__dict__
-    else:
-        return str(obj)
-
-def safe_jsonify(data):
-    """Safely serialize data to JSON, handling Neo4j objects"""
-    try:
-        return jsonify(data)
-    except TypeError:
-        # If direct jsonify fails, use our custom serializer
-        json_str = json.dumps(data, default=neo4j_json_serializer, indent=2)
-        return app.response_class(
-            response=json_str,
-            status=200,
-            mimetype='application/json'
-        )
-
 app = Flask(__name__, 
             template_folder='frontend/templates', 
             static_folder='frontend/static')
+app.json = Neo4jJSONProvider(app)
+# Behind a load balancer every request comes from the proxy's address. Trust
+# that many X-Forwarded-For hops, so remote_addr (and with it the rate-limit
+# key) is the real client again.
+trusted_proxies = int(os.getenv('TRUSTED_PROXIES', '0'))
+if trusted_proxies:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=trusted_proxies, x_proto=trusted_proxies)
 CORS(app)
+assets.init_app(app)
 
 # Initialize Neo4j connection
 neo4j_uri = os.getenv('NEO4J_URI', 'bolt://localhost:7687')
@@ -56,12 +54,215 @@ print(f"URI: {neo4j_uri}")
 print(f"User: {neo4j_user}")
 print(f"Password: {'*' * len(neo4j_password) if neo4j_password else 'None'}")
 
-db = Neo4jConnection(
+# One database (and optionally one server) per campus; see tenancy.py
+campuses = TenantRegistry.from_env(
+    os.getenv('CAMPUSES'),
+    os.getenv('DEFAULT_CAMPUS'),
     uri=neo4j_uri,
     user=neo4j_user,
-    password=neo4j_password
+    password=neo4j_password,
+    bookmarks=RequestBookmarks()
+)
+tenancy.init_app(app, campuses)
+
+def current_campus():
+    return tenancy.current_campus(campuses)
+
+# Writes return bookmarks to the client; its later reads wait for replicas to catch up
+consistency.init_app(app, current_campus)
+
+# Routes every query to the current request's campus
+db = TenantRoutedConnection(campuses)
+
+# Upper bounds for path/mutual searches; requests may only narrow them
+search_budget = SearchBudget(
+    max_depth=int(os.getenv('SEARCH_MAX_DEPTH', '6')),
+    max_expansions=int(os.getenv('SEARCH_MAX_EXPANSIONS', '2000')),
+    max_fanout=int(os.getenv('SEARCH_MAX_FANOUT', '200'))
+)
+
+# Admission control for expensive endpoints: per-client token buckets,
+# a concurrency cap on heavy routes and coalescing of identical requests
+admission = AdmissionController(
+    rate=float(os.getenv('RATE_LIMIT_RATE', '10')),
+    burst=float(os.getenv('RATE_LIMIT_BURST', '40')),
+    max_heavy=int(os.getenv('HEAVY_MAX_CONCURRENT', '4')),
+    max_queue=int(os.getenv('HEAVY_MAX_QUEUE', '32')),
+    queue_timeout=float(os.getenv('HEAVY_QUEUE_TIMEOUT', '5')),
+    scope=current_campus
+)
+
+# Mutation event stream: every successful graph write is published here,
+# tagged with the campus it happened on
+event_bus = EventBus(EventLog(path=os.getenv('EVENT_LOG_PATH') or None))
+
+def publish(event_type, **data):
+    return event_bus.publish(event_type, campus=current_campus(), **data)
+
+# Trending courses and clubs: windowed counters per campus, rebuilt from the graph
+def create_trending(campus, connection):
+    engine = TrendingEngine(
+        window_buckets=int(os.getenv('TRENDING_WINDOW_HOURS', '168')),
+        half_life_buckets=float(os.getenv('TRENDING_HALF_LIFE_HOURS', '24'))
+    )
+    # The first rebuild runs in the engine's thread; nothing here may wait on the database
+    engine.start(
+        connection,
+        refresh_seconds=int(os.getenv('TRENDING_REFRESH_SECONDS', '30')),
+        rebuild_seconds=int(os.getenv('TRENDING_REBUILD_SECONDS', '300'))
+    )
+    return engine
+
+trending = TenantScoped(campuses, create_trending)
+event_bus.subscribe(
+    lambda event: trending.get(event.data['campus']).record(
+        'course', event.data['course_code'], event.data.get('course_name')),
+    types=[events.ENROLLMENT_CREATED]
+)
+event_bus.subscribe(
+    lambda event: trending.get(event.data['campus']).record(
+        'club', event.data['club_name'], event.data['club_name']),
+    types=[events.MEMBERSHIP_CREATED]
 )
 
+# FOLLOWS neighborhoods per campus as compact int arrays, updated in place by follow/delete events
+adjacency = TenantScoped(campuses, lambda campus, connection: AdjacencyCache(
+    max_bytes=int(os.getenv('ADJACENCY_CACHE_BYTES', str(32 * 1024 * 1024))),
+    ttl=float(os.getenv('ADJACENCY_CACHE_TTL', '300'))
+))
+event_bus.subscribe(
+    lambda event: adjacency.get(event.data['campus']).add_follow(
+        event.data['student1_id'], event.data['student2_id'],
+        event.data.get('student1_name'), event.data.get('student2_name')),
+    types=[events.FOLLOW_CREATED]
+)
+event_bus.subscribe(
+    lambda event: adjacency.get(event.data['campus']).remove_student(event.data['student_id']),
+    types=[events.STUDENT_DELETED]
+)
+
+def load_neighbors(direction, connection=db):
+    """Adjacency cache loader for one direction of FOLLOWS (on the current campus by default)."""
+    query = queries.STUDENT_FOLLOWING if direction == FOLLOWING else queries.STUDENT_FOLLOWERS
+    def load(student_ids):
+        result = connection.execute_read_transaction(query.cypher, {'ids': list(student_ids)})
+        return {record['student_id']: [(n['student_id'], n['name']) for n in record['neighbors']]
+                for record in result}
+    return load
+
+def refresh_adjacency():
+    """Clients with bookmarks wrote recently, maybe through another worker; reload their reads."""
+    return bool(g.get('bookmarks'))
+
+# Background jobs: schema stats, leaderboards and recommendations are precomputed
+# for every campus. Each worker runs a scheduler; a file lock per job lets one run it.
+# Every campus gets its own jobs, so a campus whose database is down only
+# fails its own runs and keeps its last good snapshot.
+scheduler = Scheduler(
+    state_dir=os.getenv('JOB_STATE_DIR', '.jobs'),
+    max_workers=int(os.getenv('JOB_WORKERS', '2'))
+)
+
+def campus_job(job_name, campus):
+    return f'{job_name}@{campus}'
+
+# "Students like you": top-K similar students per campus. The recommendations
+# job saves the store next to its state file; every worker reloads it from there.
+def create_recommendations(campus, connection):
+    return RecommendationEngine(
+        metric=os.getenv('RECOMMENDATION_METRIC', 'idf'),
+        k=int(os.getenv('RECOMMENDATION_TOP_K', '20')),
+        path=os.path.join(scheduler.state_dir, f"{campus_job('recommendations', campus)}.npz")
+    )
+
+recommendations = TenantScoped(campuses, create_recommendations)
+
+def rebuild_recommendations(campus, connection):
+    previous = scheduler.result(campus_job('recommendations', campus))
+    return jobs.recommendations(
+        connection,
+        recommendations.get(campus),
+        previous['data'] if previous else None,
+        max_age_seconds=int(os.getenv('RECOMMENDATION_MAX_AGE_SECONDS', '86400'))
+    )
+
+for campus in campuses.campuses:
+    connection = db.for_campus(campus)
+    scheduler.add(
+        campus_job('schema_stats', campus),
+        lambda connection=connection: jobs.schema_stats(connection),
+        os.getenv('SCHEMA_STATS_SCHEDULE', '*/10 * * * *')
+    )
+    scheduler.add(
+        campus_job('leaderboards', campus),
+        lambda connection=connection: jobs.leaderboards(connection),
+        os.getenv('LEADERBOARDS_SCHEDULE', '*/5 * * * *')
+    )
+    scheduler.add(
+        campus_job('recommendations', campus),
+        lambda campus=campus, connection=connection: rebuild_recommendations(campus, connection),
+        os.getenv('RECOMMENDATION_SCHEDULE', '*/15 * * * *')
+    )
+scheduler.start()
+
+def campus_snapshot(job_name):
+    """(generated_at, data) of a job result for the current campus, or None before its first run."""
+    result = scheduler.result(campus_job(job_name, current_campus()))
+    if result is None:
+        return None
+    return result['generated_at'], result['data']
+
+# Cold-start warm-up for every campus: open pool connections, run the hot
+# queries and fill the caches. /readyz only reports ready once it is done.
+warmer = Warmer()
+
+def add_warmup_steps(campus, warm=True):
+    connection = db.for_campus(campus)
+    hot = {}
+
+    def ensure_indexes():
+        # Lookup indexes, created in every campus database
+        for index_query in queries.SCHEMA_INDEXES:
+            connection.run_query(index_query)
+        return {'indexes': len(queries.SCHEMA_INDEXES)}
+
+    def prime_queries():
+        # The leaderboards job has usually ranked the campus already
+        leaderboard = scheduler.result(campus_job('leaderboards', campus))
+        leaderboard = leaderboard['data'] if leaderboard else None
+        hot.update(warmup.hot_entities(connection, int(os.getenv('WARMUP_HOT_ENTITIES', '50')), leaderboard))
+        return warmup.prime_queries(connection, hot)
+
+    def fill_adjacency():
+        cache = adjacency.get(campus)
+        for direction in (FOLLOWING, FOLLOWERS):
+            for student_id, neighbors in load_neighbors(direction, connection)(hot['students']).items():
+                cache.put(student_id, direction, neighbors)
+        return {'students': len(hot['students'])}
+
+    def load_recommendations():
+        store = recommendations.get(campus).current()
+        if store is None:
+            # Not built on this host yet; /similar answers 503 until the job has run
+            scheduler.run_now(campus_job('recommendations', campus))
+            return {'students': None, 'building': True}
+        return {'students': len(store.student_ids)}
+
+    warmer.add(f'{campus}/indexes', ensure_indexes)
+    if not warm:
+        return
+    warmer.add(f'{campus}/pool', lambda: connection.warm_pool(int(os.getenv('WARMUP_CONNECTIONS', '8'))))
+    warmer.add(f'{campus}/queries', prime_queries)
+    warmer.add(f'{campus}/adjacency', fill_adjacency)
+    warmer.add(f'{campus}/recommendations', load_recommendations)
+
+# Without warm-up only the indexes are created before the instance reports ready
+warmup_enabled = os.getenv('WARMUP_ENABLED', 'true').lower() != 'false'
+for campus in campuses.campuses:
+    add_warmup_steps(campus, warmup_enabled)
+warmup.init_app(app, warmer)
+warmer.start()
+
 @app.route('/')
 def index():
     """Serve the main HTML page."""
@@ -80,11 +281,8 @@ def create_student():
         if not name or not student_id:
             return jsonify({'error': 'Name and student_id are required'}), 400
         
-        query = """
-        CREATE (s:Student {name: $name, student_id: $student_id})
-        RETURN s
-        """
-        result = db.run_query(query, {'name': name, 'student_id': student_id})
+        result = db.execute_write_transaction(queries.CREATE_STUDENT.cypher, {'name': name, 'student_id': student_id})
+        publish(events.STUDENT_CREATED, student_id=student_id, name=name)
         
         return jsonify({'success': True, 'data': result}), 201
     except Exception as e:
@@ -101,11 +299,8 @@ def create_course():
         if not name or not code:
             return jsonify({'error': 'Name and code are required'}), 400
         
-        query = """
-        CREATE (c:Course {name: $name, code: $code})
-        RETURN c
-        """
-        result = db.run_query(query, {'name': name, 'code': code})
+        result = db.execute_write_transaction(queries.CREATE_COURSE.cypher, {'name': name, 'code': code})
+        publish(events.COURSE_CREATED, code=code, name=name)
         
         return jsonify({'success': True, 'data': result}), 201
     except Exception as e:
@@ -122,11 +317,8 @@ def create_club():
         if not name or not description:
             return jsonify({'error': 'Name and description are required'}), 400
         
-        query = """
-        CREATE (c:Club {name: $name, description: $description})
-        RETURN c
-        """
-        result = db.run_query(query, {'name': name, 'description': description})
+        result = db.execute_write_transaction(queries.CREATE_CLUB.cypher, {'name': name, 'description': description})
+        publish(events.CLUB_CREATED, name=name)
         
         return jsonify({'success': True, 'data': result}), 201
     except Exception as e:
@@ -136,11 +328,7 @@ def create_club():
 def get_student(student_id):
     """Read and return a single student's details."""
     try:
-        query = """
-        MATCH (s:Student {student_id: $student_id})
-        RETURN s
-        """
-        result = db.run_query(query, {'student_id': student_id})
+        result = db.execute_read_transaction(queries.GET_STUDENT.cypher, {'student_id': student_id})
         
         if not result:
             return jsonify({'error': 'Student not found'}), 404
@@ -153,12 +341,9 @@ def get_student(student_id):
 def delete_student(student_id):
     """Delete a student node using DETACH DELETE."""
     try:
-        query = """
-        MATCH (s:Student {student_id: $student_id})
-        DETACH DELETE s
-        RETURN count(s) as deleted_count
-        """
-        result = db.run_query(query, {'student_id': student_id})
+        result = db.execute_write_transaction(queries.DELETE_STUDENT.cypher, {'student_id': student_id})
+        if result[0]['deleted_count']:
+            publish(events.STUDENT_DELETED, student_id=student_id)
         
         return jsonify({'success': True, 'deleted_count': result[0]['deleted_count']}), 200
     except Exception as e:
@@ -177,13 +362,10 @@ def create_follow_relationship():
         if not student1_id or not student2_id:
             return jsonify({'error': 'Both student1_id and student2_id are required'}), 400
         
-        query = """
-        MATCH (s1:Student {student_id: $student1_id})
-        MATCH (s2:Student {student_id: $student2_id})
-        CREATE (s1)-[:FOLLOWS]->(s2)
-        RETURN s1, s2
-        """
-        result = db.run_query(query, {'student1_id': student1_id, 'student2_id': student2_id})
+        result = db.execute_write_transaction(queries.CREATE_FOLLOW.cypher, {'student1_id': student1_id, 'student2_id': student2_id})
+        if result:
+            publish(events.FOLLOW_CREATED, student1_id=student1_id, student2_id=student2_id,
+                    student1_name=result[0]['s1'].get('name'), student2_name=result[0]['s2'].get('name'))
         
         return jsonify({'success': True, 'data': result}), 201
     except Exception as e:
@@ -200,13 +382,10 @@ def create_enrollment_relationship():
         if not student_id or not course_code:
             return jsonify({'error': 'Both student_id and course_code are required'}), 400
         
-        query = """
-        MATCH (s:Student {student_id: $student_id})
-        MATCH (c:Course {code: $course_code})
-        CREATE (s)-[:ENROLLED_IN]->(c)
-        RETURN s, c
-        """
-        result = db.run_query(query, {'student_id': student_id, 'course_code': course_code})
+        result = db.execute_write_transaction(queries.CREATE_ENROLLMENT.cypher, {'student_id': student_id, 'course_code': course_code})
+        if result:
+            publish(events.ENROLLMENT_CREATED, student_id=student_id, course_code=course_code,
+                    course_name=result[0]['c'].get('name'))
         
         return jsonify({'success': True, 'data': result}), 201
     except Exception as e:
@@ -223,13 +402,9 @@ def create_club_membership():
         if not student_id or not club_name:
             return jsonify({'error': 'Both student_id and club_name are required'}), 400
         
-        query = """
-        MATCH (s:Student {student_id: $student_id})
-        MATCH (c:Club {name: $club_name})
-        CREATE (s)-[:MEMBER_OF]->(c)
-        RETURN s, c
-        """
-        result = db.run_query(query, {'student_id': student_id, 'club_name': club_name})
+        result = db.execute_write_transaction(queries.CREATE_MEMBERSHIP.cypher, {'student_id': student_id, 'club_name': club_name})
+        if result:
+            publish(events.MEMBERSHIP_CREATED, student_id=student_id, club_name=club_name)
         
         return jsonify({'success': True, 'data': result}), 201
     except Exception as e:
@@ -241,11 +416,9 @@ def create_club_membership():
 def get_student_following(student_id):
     """Find all students this student follows."""
     try:
-        query = """
-        MATCH (s:Student {student_id: $student_id})-[:FOLLOWS]->(followed:Student)
-        RETURN followed
-        """
-        result = db.run_query(query, {'student_id': student_id})
+        neighbors = adjacency.current.neighbors(student_id, FOLLOWING, load_neighbors(FOLLOWING),
+                                                refresh=refresh_adjacency())
+        result = [{'followed': {'student_id': sid, 'name': name}} for sid, name in neighbors]
         
         return jsonify({'success': True, 'data': result}), 200
     except Exception as e:
@@ -255,11 +428,9 @@ def get_student_following(student_id):
 def get_student_followers(student_id):
     """Find all students who follow this student."""
     try:
-        query = """
-        MATCH (follower:Student)-[:FOLLOWS]->(s:Student {student_id: $student_id})
-        RETURN follower
-        """
-        result = db.run_query(query, {'student_id': student_id})
+        neighbors = adjacency.current.neighbors(student_id, FOLLOWERS, load_neighbors(FOLLOWERS),
+                                                refresh=refresh_adjacency())
+        result = [{'follower': {'student_id': sid, 'name': name}} for sid, name in neighbors]
         
         return jsonify({'success': True, 'data': result}), 200
     except Exception as e:
@@ -269,11 +440,7 @@ def get_student_followers(student_id):
 def get_course_students(course_code):
     """Find all students enrolled in this course."""
     try:
-        query = """
-        MATCH (s:Student)-[:ENROLLED_IN]->(c:Course {code: $course_code})
-        RETURN s
-        """
-        result = db.run_query(query, {'course_code': course_code})
+        result = db.execute_read_transaction(queries.COURSE_STUDENTS.cypher, {'course_code': course_code})
         
         return jsonify({'success': True, 'data': result}), 200
     except Exception as e:
@@ -283,82 +450,174 @@ def get_course_students(course_code):
 def get_club_members(club_name):
     """Find all students who are members of this club."""
     try:
-        query = """
-        MATCH (s:Student)-[:MEMBER_OF]->(c:Club {name: $club_name})
-        RETURN s
-        """
-        result = db.run_query(query, {'club_name': club_name})
+        result = db.execute_read_transaction(queries.CLUB_MEMBERS.cypher, {'club_name': club_name})
         
         return jsonify({'success': True, 'data': result}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/student/<student_id>/suggested_friends', methods=['GET'])
+@admission.limit(cost=5, heavy=True, coalesce=True)
 def get_suggested_friends(student_id):
     """Find friends of friends (suggested friends)."""
     try:
-        query = """
-        MATCH (s:Student {student_id: $student_id})-[:FOLLOWS]->(friend:Student)-[:FOLLOWS]->(suggested:Student)
-        WHERE NOT (s)-[:FOLLOWS]->(suggested) AND s <> suggested
-        RETURN DISTINCT suggested
-        """
-        result = db.run_query(query, {'student_id': student_id})
+        suggested = adjacency.current.friends_of_friends(student_id, load_neighbors(FOLLOWING),
+                                                         refresh=refresh_adjacency())
+        result = [{'suggested': {'student_id': sid, 'name': name}} for sid, name in suggested]
         
         return jsonify({'success': True, 'data': result}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/student/<student_id>/common_interests', methods=['GET'])
+@admission.limit(cost=10, heavy=True, coalesce=True)
 def get_common_interests(student_id):
     """Find students with shared courses or clubs and show what they have in common."""
     try:
-        query = """
-        MATCH (s:Student {student_id: $student_id})
-        MATCH (other:Student)
-        WHERE s <> other
-        
-        // Find common courses
-        OPTIONAL MATCH (s)-[:ENROLLED_IN]->(course:Course)<-[:ENROLLED_IN]-(other)
-        WITH s, other, collect(DISTINCT course.name) as common_courses
-        
-        // Find common clubs
-        OPTIONAL MATCH (s)-[:MEMBER_OF]->(club:Club)<-[:MEMBER_OF]-(other)
-        WITH s, other, common_courses, collect(DISTINCT club.name) as common_clubs
-        
-        // Return only students with at least one common interest
-        WHERE size(common_courses) > 0 OR size(common_clubs) > 0
-        
-        RETURN other.name as student_name, 
-               other.student_id as student_id,
-               common_courses,
-               common_clubs,
-               (size(common_courses) + size(common_clubs)) as total_common_interests
-        ORDER BY total_common_interests DESC
-        """
-        result = db.run_query(query, {'student_id': student_id})
+        result = db.execute_read_transaction(queries.COMMON_INTERESTS.cypher, {'student_id': student_id})
+        
+        return jsonify({'success': True, 'data': result}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+def _request_budget():
+    """Narrow the configured search budget with optional query-string limits."""
+    return search_budget.capped(
+        max_depth=request.args.get('max_depth', type=int),
+        max_expansions=request.args.get('max_expansions', type=int),
+        max_fanout=request.args.get('max_fanout', type=int)
+    )
+
+def _student_summaries(student_ids):
+    """Look up name and id for each student, preserving the given order."""
+    if not student_ids:
+        return []
+    result = db.execute_read_transaction(queries.STUDENT_SUMMARIES.cypher, {'ids': list(student_ids)})
+    names = {record['student_id']: record['name'] for record in result}
+    return [{'student_id': sid, 'name': names.get(sid)} for sid in student_ids]
+
+@app.route('/api/student/<student_id>/path/<other_id>', methods=['GET'])
+@admission.limit(cost=5, heavy=True, coalesce=True)
+def get_connection_path(student_id, other_id):
+    """Find how two students are connected through FOLLOWS, within a search budget."""
+    try:
+        budget = _request_budget()
+        result = shortest_path(student_id, other_id, cypher_neighbors(db), budget)
+        result['path'] = _student_summaries(result['path']) if result['path'] else None
+        result['budget'] = budget.to_dict()
+        
+        return jsonify({'success': True, 'data': result}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/student/<student_id>/mutuals/<other_id>', methods=['GET'])
+@admission.limit(cost=2, coalesce=True)
+def get_mutual_connections(student_id, other_id):
+    """Find students connected to both students, within a search budget."""
+    try:
+        budget = _request_budget()
+        result = mutual_connections(student_id, other_id, cypher_neighbors(db), budget)
+        result['mutuals'] = _student_summaries(result['mutuals'])
+        result['budget'] = budget.to_dict()
         
         return jsonify({'success': True, 'data': result}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 @app.route('/api/popular_courses', methods=['GET'])
+@admission.limit(cost=2, coalesce=True)
 def get_popular_courses():
     """Find the top 3 courses with the most students enrolled."""
     try:
-        query = """
-        MATCH (s:Student)-[:ENROLLED_IN]->(c:Course)
-        RETURN c, COUNT(s) as student_count
-        ORDER BY student_count DESC
-        LIMIT 3
-        """
-        result = db.run_query(query)
+        snapshot = campus_snapshot('leaderboards')
+        if snapshot is not None:
+            result = snapshot[1]['courses'][:3]
+        else:
+            result = db.execute_read_transaction(queries.POPULAR_COURSES.cypher, {'limit': 3})
+        
+        return jsonify({'success': True, 'data': result}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/leaderboards', methods=['GET'])
+def get_leaderboards():
+    """Top courses, clubs and most followed students, from the precomputed snapshot."""
+    try:
+        snapshot = campus_snapshot('leaderboards')
+        if snapshot is None:
+            return jsonify({'error': 'Leaderboards are still being computed'}), 503
+        
+        generated_at, result = snapshot
+        return jsonify({'success': True, 'data': result, 'generated_at': generated_at}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/trending', methods=['GET'])
+def get_trending():
+    """Courses and clubs gaining the most members recently, from the precomputed snapshot."""
+    try:
+        kind = request.args.get('kind')
+        engine = trending.current
+        limit = max(1, min(request.args.get('limit', 10, type=int), engine.top_n))
+        
+        if kind is not None and kind not in TRENDING_KINDS:
+            return jsonify({'error': f"kind must be one of: {', '.join(TRENDING_KINDS)}"}), 400
+        
+        kinds = [kind] if kind else list(TRENDING_KINDS)
+        result = {k: engine.trending(k, limit) for k in kinds}
         
         return jsonify({'success': True, 'data': result}), 200
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+# Mutation Event Stream
+
+@app.route('/api/events', methods=['GET'])
+def get_events():
+    """Replay mutation events after a given offset."""
+    try:
+        since = request.args.get('since', 0, type=int)
+        limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+        campus = current_campus()
+        replay = event_bus.log.read(since, limit, match=lambda event: event.data.get('campus') == campus)
+        result = [event.to_dict() for event in replay]
+        
+        return jsonify({'success': True, 'data': result, 'last_offset': event_bus.log.last_offset}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/events/stream', methods=['GET'])
+def stream_events():
+    """Push mutation events to the browser as Server-Sent Events."""
+    campus = current_campus()
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', type=int)
+    
+    return Response(
+        event_bus.stream(since, match=lambda event: event.data.get('campus') == campus),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/api/student/<student_id>/similar', methods=['GET'])
+def get_similar_students(student_id):
+    """Students most like this one, served from the precomputed neighbor store."""
+    try:
+        limit = max(1, request.args.get('limit', 10, type=int))
+        engine = recommendations.current
+        result = engine.similar(student_id, limit)
+        
+        if result is None:
+            return jsonify({'error': 'Recommendations are still being computed'}), 503
+        
+        return jsonify({'success': True, 'data': result, 'metric': engine.metric}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Schema and Database Information Endpoints
 @app.route('/api/schema', methods=['GET'])
+@admission.limit(cost=20, heavy=True, coalesce=True)
 def get_database_schema():
     """Get comprehensive database schema information"""
     try:
@@ -371,28 +630,16 @@ def get_database_schema():
         }
         
         # Get node labels and their properties
-        node_query = """
-        CALL db.labels() YIELD label
-        RETURN collect(label) as labels
-        """
-        labels_result = db.run_query(node_query)
+        labels_result = db.execute_read_transaction(queries.LABELS.cypher)
         labels = labels_result[0]['labels'] if labels_result else []
         
         for label in labels:
             # Get properties for each node type
-            prop_query = f"""
-            MATCH (n:{label})
-            WITH keys(n) as keys
-            UNWIND keys as key
-            RETURN DISTINCT key
-            ORDER BY key
-            """
-            props_result = db.run_query(prop_query)
+            props_result = db.execute_read_transaction(queries.LABEL_PROPERTIES.render(label=label))
             properties = [record['key'] for record in props_result]
             
             # Get count of nodes
-            count_query = f"MATCH (n:{label}) RETURN count(n) as count"
-            count_result = db.run_query(count_query)
+            count_result = db.execute_read_transaction(queries.LABEL_COUNT.render(label=label))
             count = count_result[0]['count'] if count_result else 0
             
             schema_info["nodes"][label] = {
@@ -401,21 +648,13 @@ def get_database_schema():
             }
         
         # Get relationship types and their properties
-        rel_query = """
-        CALL db.relationshipTypes() YIELD relationshipType
-        RETURN collect(relationshipType) as types
-        """
-        rel_result = db.run_query(rel_query)
+        rel_result = db.execute_read_transaction(queries.RELATIONSHIP_TYPES.cypher)
         rel_types = rel_result[0]['types'] if rel_result else []
         
         for rel_type in rel_types:
             # Get relationship count and patterns
-            rel_pattern_query = f"""
-            MATCH (a)-[r:{rel_type}]->(b)
-            WITH labels(a) as startLabels, labels(b) as endLabels, count(r) as count
-            RETURN startLabels[0] as startLabel, endLabels[0] as endLabel, count
-            """
-            pattern_result = db.run_query(rel_pattern_query)
+            pattern_result = db.execute_read_transaction(
+                queries.RELATIONSHIP_PATTERNS.render(rel_type=rel_type))
             
             patterns = []
             total_count = 0
@@ -434,8 +673,7 @@ def get_database_schema():
         
         # Get constraints
         try:
-            constraints_query = "SHOW CONSTRAINTS"
-            constraints_result = db.run_query(constraints_query)
+            constraints_result = db.execute_read_transaction(queries.SHOW_CONSTRAINTS.cypher)
             # Convert Neo4j records to dictionaries, handling special objects
             schema_info["constraints"] = []
             for record in constraints_result:
@@ -448,8 +686,7 @@ def get_database_schema():
         
         # Get indexes
         try:
-            indexes_query = "SHOW INDEXES"
-            indexes_result = db.run_query(indexes_query)
+            indexes_result = db.execute_read_transaction(queries.SHOW_INDEXES.cypher)
             # Convert Neo4j records to dictionaries, handling special objects
             schema_info["indexes"] = []
             for record in indexes_result:
@@ -461,14 +698,7 @@ def get_database_schema():
             schema_info["indexes"] = []
         
         # Get database statistics
-        stats_query = """
-        MATCH (n) 
-        WITH count(n) as totalNodes
-        MATCH ()-[r]->()
-        WITH totalNodes, count(r) as totalRelationships
-        RETURN totalNodes, totalRelationships
-        """
-        stats_result = db.run_query(stats_query)
+        stats_result = db.execute_read_transaction(queries.GRAPH_STATISTICS.cypher)
         if stats_result:
             schema_info["statistics"] = {
                 "total_nodes": stats_result[0]['totalNodes'],
@@ -477,38 +707,25 @@ def get_database_schema():
                 "relationship_types": len(rel_types)
             }
         
-        return safe_jsonify({
+        return jsonify({
             'success': True,
             'data': schema_info,
             'message': 'Database schema retrieved successfully'
         })
         
     except Exception as e:
-        return safe_jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/schema/visual', methods=['GET'])
+@admission.limit(cost=10, heavy=True, coalesce=True)
 def get_visual_schema():
     """Get schema in a format suitable for visualization"""
     try:
         # Get all relationships with their patterns
-        visual_query = """
-        MATCH (a)-[r]->(b)
-        WITH labels(a)[0] as sourceLabel, type(r) as relationshipType, labels(b)[0] as targetLabel, count(r) as count
-        RETURN sourceLabel, relationshipType, targetLabel, count
-        ORDER BY count DESC
-        """
-        
-        relationships = db.run_query(visual_query)
+        relationships = db.execute_read_transaction(queries.VISUAL_RELATIONSHIPS.cypher)
         
         # Get node information
-        nodes_query = """
-        MATCH (n)
-        WITH labels(n)[0] as label, count(n) as count
-        RETURN label, count
-        ORDER BY count DESC
-        """
-        
-        nodes = db.run_query(nodes_query)
+        nodes = db.execute_read_transaction(queries.VISUAL_NODES.cypher)
         
         visual_schema = {
             "nodes": [{"label": record['label'], "count": record['count']} for record in nodes],
@@ -523,86 +740,72 @@ def get_visual_schema():
             ]
         }
         
-        return safe_jsonify({
+        return jsonify({
             'success': True,
             'data': visual_schema,
             'message': 'Visual schema retrieved successfully'
         })
         
     except Exception as e:
-        return safe_jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @app.route('/api/schema/simple', methods=['GET'])
+@admission.limit(cost=10, heavy=True, coalesce=True)
 def get_simple_schema():
     """Get a simplified database schema without complex objects"""
     try:
-        schema_info = {
-            "nodes": {},
-            "relationships": {},
-            "statistics": {}
-        }
-        
-        # Get node labels and their basic info
-        node_query = "CALL db.labels() YIELD label RETURN collect(label) as labels"
-        labels_result = db.run_query(node_query)
-        labels = labels_result[0]['labels'] if labels_result else []
-        
-        for label in labels:
-            # Get count and sample properties
-            count_query = f"MATCH (n:{label}) RETURN count(n) as count LIMIT 1"
-            count_result = db.run_query(count_query)
-            count = count_result[0]['count'] if count_result else 0
-            
-            # Get sample properties from first node
-            prop_query = f"MATCH (n:{label}) RETURN keys(n) as props LIMIT 1"
-            props_result = db.run_query(prop_query)
-            properties = props_result[0]['props'] if props_result else []
-            
-            schema_info["nodes"][label] = {
-                "count": int(count),
-                "properties": list(properties)
-            }
-        
-        # Get relationship types and counts
-        rel_query = "CALL db.relationshipTypes() YIELD relationshipType RETURN collect(relationshipType) as types"
-        rel_result = db.run_query(rel_query)
-        rel_types = rel_result[0]['types'] if rel_result else []
-        
-        for rel_type in rel_types:
-            # Get relationship count and simple patterns
-            count_query = f"MATCH ()-[r:{rel_type}]->() RETURN count(r) as count"
-            count_result = db.run_query(count_query)
-            count = count_result[0]['count'] if count_result else 0
-            
-            schema_info["relationships"][rel_type] = {
-                "count": int(count)
-            }
-        
-        # Basic statistics
-        total_nodes_query = "MATCH (n) RETURN count(n) as total"
-        total_nodes_result = db.run_query(total_nodes_query)
-        total_nodes = total_nodes_result[0]['total'] if total_nodes_result else 0
-        
-        total_rels_query = "MATCH ()-[r]->() RETURN count(r) as total"
-        total_rels_result = db.run_query(total_rels_query)
-        total_rels = total_rels_result[0]['total'] if total_rels_result else 0
-        
-        schema_info["statistics"] = {
-            "total_nodes": int(total_nodes),
-            "total_relationships": int(total_rels),
-            "node_types": len(labels),
-            "relationship_types": len(rel_types)
-        }
+        snapshot = campus_snapshot('schema_stats')
+        if snapshot is not None:
+            generated_at, schema_info = snapshot
+        else:
+            generated_at, schema_info = None, jobs.schema_stats(db)
         
         return jsonify({
             'success': True,
             'data': schema_info,
+            'generated_at': generated_at,
             'message': 'Simple database schema retrieved successfully'
         })
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+@app.route('/api/cache/adjacency', methods=['GET'])
+def get_adjacency_cache_metrics():
+    """Hit rate and memory use of the current campus's adjacency cache."""
+    return jsonify({'success': True, 'data': adjacency.current.metrics()}), 200
+
+# Background Jobs
+
+@app.route('/api/jobs', methods=['GET'])
+def get_jobs():
+    """Status of every scheduled job and usage of this worker's job pool."""
+    try:
+        result = [scheduler.status(name) for name in scheduler.jobs]
+        
+        return jsonify({'success': True, 'data': result, 'pool': scheduler.metrics()}), 200
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/jobs/<job_name>', methods=['GET'])
+def get_job(job_name):
+    """Status of one scheduled job."""
+    if job_name not in scheduler.jobs:
+        return jsonify({'error': 'Job not found'}), 404
+    
+    return jsonify({'success': True, 'data': scheduler.status(job_name)}), 200
+
+@app.route('/api/jobs/<job_name>/run', methods=['POST'])
+@admission.limit(cost=20)
+def run_job(job_name):
+    """Run a job now instead of waiting for its schedule."""
+    if job_name not in scheduler.jobs:
+        return jsonify({'error': 'Job not found'}), 404
+    if not scheduler.run_now(job_name):
+        return jsonify({'error': 'Job is already running'}), 409
+    
+    return jsonify({'success': True, 'data': scheduler.status(job_name)}), 202
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({'error': 'Endpoint not found'}), 404
@@ -0,0 +1,187 @@
+# assets.py
+"""
+Static asset pipeline: fingerprinting, precompression and long-lived caching.
+
+Build step (run at deploy time, or whenever the frontend changes):
+
+    python assets.py
+
+This copies every CSS/JS file under ``frontend/static`` to
+``frontend/static/dist`` with its content hash in the filename
+(``css/styles.css`` -> ``dist/css/styles.3f2a9c1d.css``). It writes gzip and,
+when the optional ``brotli`` package is installed, brotli variants next to
+each copy, plus a ``manifest.json`` mapping original names to hashed ones.
+
+Serving mode (``init_app``): when a manifest exists, ``url_for('static', ...)``
+in templates resolves to the hashed name automatically. Hashed files are
+served with ``Cache-Control: immutable``, and a precompressed variant is
+chosen from the request's ``Accept-Encoding``. Without a manifest, static
+files are served as before.
+"""
+import gzip
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+
+from flask import request, send_from_directory
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DIST_DIR = 'dist'
+MANIFEST_NAME = 'manifest.json'
+ASSET_EXTENSIONS = ('.css', '.js')
+IMMUTABLE_CACHE = 'public, max-age=31536000, immutable'
+# Preferred first when the client accepts several
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+def _content_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+
+def _compress(path, data):
+    """Write precompressed variants of data; return the encodings kept."""
+    encodings = []
+    gzipped = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gzipped) < len(data):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gzipped)
+        encodings.append('gzip')
+    if brotli is not None:
+        brotlied = brotli.compress(data, quality=11)
+        if len(brotlied) < len(data):
+            with open(path + '.br', 'wb') as f:
+                f.write(brotlied)
+            encodings.append('br')
+    return encodings
+
+
+def build_assets(static_folder):
+    """
+    Fingerprint and precompress the assets in a static folder.
+
+    Args:
+        static_folder (str): Path of the Flask static folder
+
+    Returns:
+        dict: The manifest written to ``dist/manifest.json``
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    if os.path.isdir(dist):
+        shutil.rmtree(dist)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = [d for d in dirs if os.path.join(root, d) != dist]
+        for name in sorted(files):
+            if not name.endswith(ASSET_EXTENSIONS):
+                continue
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, '/')
+            stem, ext = os.path.splitext(logical)
+            hashed = f"{DIST_DIR}/{stem}.{_content_hash(source)}{ext}"
+
+            target = os.path.join(static_folder, *hashed.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with open(source, 'rb') as f:
+                data = f.read()
+            with open(target, 'wb') as f:
+                f.write(data)
+
+            manifest[logical] = {'path': hashed, 'encodings': _compress(target, data)}
+            logging.info(f"{logical} -> {hashed} ({', '.join(manifest[logical]['encodings']) or 'uncompressed'})")
+
+    with open(os.path.join(dist, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder):
+    """Return the build manifest, or None if the assets were never built."""
+    path = os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def _accepted_encodings():
+    """Content codings the client accepts with a non-zero quality."""
+    accepted = set()
+    for part in request.headers.get('Accept-Encoding', '').split(','):
+        coding, *params = part.split(';')
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def init_app(app):
+    """
+    Serve fingerprinted, precompressed assets if they have been built.
+
+    Returns:
+        dict: The loaded manifest, or None when serving raw files
+    """
+    manifest = load_manifest(app.static_folder)
+    if manifest is None:
+        logging.info("No asset manifest found; serving raw static files")
+        return None
+
+    hashed_files = {entry['path']: entry for entry in manifest.values()}
+    raw_static = app.view_functions['static']
+
+    @app.url_defaults
+    def hashed_static_url(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in manifest:
+            values['filename'] = manifest[values['filename']]['path']
+
+    def serve_static(filename):
+        entry = hashed_files.get(filename)
+        if entry is None:
+            return raw_static(filename=filename)
+
+        mimetype = 'text/css' if filename.endswith('.css') else 'application/javascript'
+        accepted = _accepted_encodings()
+        encoding, served = None, filename
+        for coding, suffix in ENCODINGS:
+            if coding in entry['encodings'] and coding in accepted:
+                encoding, served = coding, filename + suffix
+                break
+
+        response = send_from_directory(app.static_folder, served, mimetype=mimetype,
+                                       max_age=31536000)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.headers['Cache-Control'] = IMMUTABLE_CACHE
+        response.vary.add('Accept-Encoding')
+        return response
+
+    app.view_functions['static'] = serve_static
+    logging.info(f"Serving {len(manifest)} fingerprinted assets")
+    return manifest
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    folder = sys.argv[1] if len(sys.argv) > 1 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'frontend', 'static')
+    built = build_assets(folder)
+    print(f"Built {len(built)} assets into {os.path.join(folder, DIST_DIR)}")
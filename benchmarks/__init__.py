@@ -0,0 +1,3 @@
+# benchmarks/__init__.py
+
+# Offline benchmark harness. Run a benchmark with: python -m benchmarks.<name>
@@ -0,0 +1,84 @@
+# benchmarks/bench_graph_search.py
+"""
+Benchmark bounded path and mutual-connection searches on power-law graphs.
+
+Compares ``graph_search.shortest_path`` against a plain single-sided BFS (what
+an unbounded ``shortestPath`` effectively does) and reports latency, nodes
+expanded and how often the budget cut a search short.
+
+    python -m benchmarks.bench_graph_search --students 50000
+"""
+import argparse
+import random
+import time
+from collections import deque
+
+from benchmarks.graphs import power_law_graph, adjacency_neighbors
+from graph_search import SearchBudget, shortest_path, mutual_connections
+
+
+def naive_bfs(source, target, adjacency):
+    """Single-sided, unbounded BFS; returns (length, nodes expanded)."""
+    seen = {source}
+    queue = deque([(source, 0)])
+    expanded = 0
+    while queue:
+        node, depth = queue.popleft()
+        expanded += 1
+        for neighbor in adjacency[node]:
+            if neighbor == target:
+                return depth + 1, expanded
+            if neighbor not in seen:
+                seen.add(neighbor)
+                queue.append((neighbor, depth + 1))
+    return None, expanded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--edges', type=int, default=3)
+    parser.add_argument('--pairs', type=int, default=200)
+    parser.add_argument('--max-depth', type=int, default=6)
+    parser.add_argument('--max-expansions', type=int, default=2000)
+    parser.add_argument('--max-fanout', type=int, default=200)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    adjacency = power_law_graph(args.students, args.edges)
+    degrees = sorted((len(n) for n in adjacency.values()), reverse=True)
+    print(f"Graph: {args.students} students, {sum(degrees) // 2} edges, "
+          f"max degree {degrees[0]}, built in {time.perf_counter() - started:.2f}s")
+
+    rng = random.Random(7)
+    ids = list(adjacency)
+    pairs = [tuple(rng.sample(ids, 2)) for _ in range(args.pairs)]
+    neighbors = adjacency_neighbors(adjacency)
+    budget = SearchBudget(args.max_depth, args.max_expansions, args.max_fanout)
+
+    started = time.perf_counter()
+    naive = [naive_bfs(a, b, adjacency) for a, b in pairs]
+    naive_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    bounded = [shortest_path(a, b, neighbors, budget) for a, b in pairs]
+    bounded_time = time.perf_counter() - started
+
+    started = time.perf_counter()
+    mutuals = [mutual_connections(a, b, neighbors, budget) for a, b in pairs]
+    mutual_time = time.perf_counter() - started
+
+    agree = sum(1 for (length, _), r in zip(naive, bounded)
+                if r['complete'] and r['length'] == length)
+    print(f"naive BFS:      {naive_time / len(pairs) * 1000:8.3f} ms/pair, "
+          f"{sum(e for _, e in naive) / len(pairs):10.1f} nodes expanded")
+    print(f"bidirectional:  {bounded_time / len(pairs) * 1000:8.3f} ms/pair, "
+          f"{sum(r['expanded'] for r in bounded) / len(pairs):10.1f} nodes expanded, "
+          f"{sum(not r['complete'] for r in bounded)} partial, "
+          f"{agree}/{len(pairs)} exact matches")
+    print(f"mutuals:        {mutual_time / len(pairs) * 1000:8.3f} ms/pair, "
+          f"{sum(not r['complete'] for r in mutuals)} partial")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_json.py
+"""
+Benchmark response serialization: legacy ``safe_jsonify`` vs ``Neo4jJSONProvider``.
+
+The payload mimics ``/api/schema``: many SHOW INDEXES/CONSTRAINTS rows carrying
+Neo4j ``DateTime`` values, which made the legacy path fail ``jsonify`` and
+re-serialize everything with ``indent=2``. Reports bytes per response and
+serialization time for each variant.
+
+    python -m benchmarks.bench_json --rows 2000
+"""
+import argparse
+import json
+import time
+
+from flask import Flask, jsonify
+from neo4j.time import DateTime
+
+import serialization
+from serialization import Neo4jJSONProvider, neo4j_json_default
+
+
+def schema_payload(rows):
+    """Build a schema-like payload with ``rows`` index entries."""
+    stamp = DateTime(2024, 5, 17, 12, 30, 15)
+    return {
+        'success': True,
+        'data': {
+            'nodes': {f"Label{i}": {'properties': ['name', 'student_id', 'code'], 'count': i * 37}
+                      for i in range(50)},
+            'indexes': [{'id': i, 'name': f"index_{i}", 'state': 'ONLINE', 'type': 'RANGE',
+                         'labelsOrTypes': ['Student'], 'properties': ['student_id'],
+                         'lastRead': stamp, 'readCount': i * 11}
+                        for i in range(rows)],
+        },
+        'message': 'Database schema retrieved successfully',
+    }
+
+
+def legacy_response(app, data):
+    """The pre-provider ``safe_jsonify`` logic."""
+    try:
+        return jsonify(data)
+    except TypeError:
+        json_str = json.dumps(data, default=neo4j_json_default, indent=2)
+        return app.response_class(response=json_str, status=200, mimetype='application/json')
+
+
+def measure(label, app, build, payload, repeat):
+    with app.app_context():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            response = build(payload)
+        elapsed = time.perf_counter() - started
+        size = len(response.get_data())
+    print(f"{label:<22} {size:>10,} bytes  {elapsed / repeat * 1000:8.3f} ms/response")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    payload = schema_payload(args.rows)
+
+    legacy = Flask('legacy')
+    measure('legacy safe_jsonify', legacy, lambda d: legacy_response(legacy, d), payload, args.repeat)
+
+    provider = Flask('provider')
+    provider.json = Neo4jJSONProvider(provider)
+    fast_backend = serialization.orjson
+    serialization.orjson = None
+    measure('provider (json)', provider, provider.json.response, payload, args.repeat)
+    serialization.orjson = fast_backend
+    if fast_backend is not None:
+        measure('provider (orjson)', provider, provider.json.response, payload, args.repeat)
+    else:
+        print("provider (orjson)      skipped: orjson is not installed")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# benchmarks/bench_recommendations.py
+"""
+Benchmark building the "students like you" neighbor store.
+
+Generates a synthetic campus where course and club sizes follow a power law
+(a few giant intro courses, many small clubs), builds the incidence matrix
+and times ``top_k_similar`` for every metric. Also reports the store size
+and the per-request lookup latency.
+
+    python -m benchmarks.bench_recommendations --students 20000
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from benchmarks.graphs import campus_memberships
+from recommendations import METRICS, NeighborStore, build_incidence, top_k_similar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--courses', type=int, default=400)
+    parser.add_argument('--clubs', type=int, default=150)
+    parser.add_argument('--per-student', type=int, default=5)
+    parser.add_argument('--k', type=int, default=20)
+    args = parser.parse_args()
+
+    rows = campus_memberships(args.students, args.courses, args.clubs, args.per_student)
+    started = time.perf_counter()
+    student_ids, student_names, item_names, item_kinds, incidence = build_incidence(rows)
+    print(f"Incidence: {incidence.shape[0]} x {incidence.shape[1]}, {incidence.nnz} entries, "
+          f"built in {time.perf_counter() - started:.2f}s")
+
+    for metric in METRICS:
+        started = time.perf_counter()
+        neighbors, scores = top_k_similar(incidence, metric, args.k)
+        elapsed = time.perf_counter() - started
+        store = NeighborStore(student_ids, student_names, item_names, item_kinds, incidence,
+                              neighbors, scores, metric)
+        sample = random.Random(1).sample(student_ids, 500)
+        started = time.perf_counter()
+        for sid in sample:
+            store.similar(sid, 10)
+        lookup = (time.perf_counter() - started) / len(sample)
+        print(f"{metric:<8} build {elapsed:7.2f}s  store {store.memory_bytes() / 1e6:6.1f} MB  "
+              f"lookup {lookup * 1e6:7.1f} us  mean top score {float(np.mean(scores[:, 0])):.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,259 @@
+# benchmarks/check_query_plans.py
+"""
+Check the query plans of every registered Cypher statement.
+
+Loads a generated campus (power-law FOLLOWS, Zipf-sized courses and clubs)
+into a Neo4j database. Then, for every statement in ``queries.QUERIES``, it
+runs EXPLAIN and PROFILE inside a transaction that is rolled back, so writes
+leave no trace. A statement fails when:
+
+- a label listed in its ``seeks`` is not reached through an index seek
+- a full scan or CartesianProduct appears that it does not ``allow``
+- a variable-length expand has no upper bound
+- estimated rows or db hits grow by more than ``--tolerance`` over the
+  baseline, or the plan gains an operator the baseline did not have
+
+A statement with no baseline entry fails too, so the regression check can
+never pass silently. Record or refresh the baseline with ``--update`` after
+an intended change.
+The database is wiped by ``--reset``, so point it at a scratch instance.
+
+    python -m benchmarks.check_query_plans --reset
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from neo4j import GraphDatabase
+
+import queries
+from benchmarks.graphs import campus_memberships, power_law_graph
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'query_plans_baseline.json')
+
+# Growth below this many rows/hits is noise, even if it exceeds the tolerance
+MIN_DELTA = 10
+
+_VAR_LENGTH = re.compile(r'\*(\d*)(\.\.(\d*))?')
+
+
+def operators(plan):
+    """
+    Flatten a plan or profile tree.
+
+    Returns:
+        list: ``{name, details, estimated_rows, db_hits}`` per operator, root first
+    """
+    flat = []
+    stack = [plan]
+    while stack:
+        node = stack.pop()
+        args = node.get('args', {})
+        flat.append({
+            'name': node['operatorType'].split('@')[0],
+            'details': args.get('Details', ''),
+            'estimated_rows': args.get('EstimatedRows', 0),
+            'db_hits': node.get('dbHits', args.get('DbHits', 0)),
+        })
+        stack.extend(reversed(node.get('children', [])))
+    return flat
+
+
+def unbounded_expands(ops):
+    """Variable-length expands whose pattern has no upper bound."""
+    found = []
+    for op in ops:
+        if 'VarLengthExpand' not in op['name'] and op['name'] != 'ShortestPath':
+            continue
+        for match in _VAR_LENGTH.finditer(op['details']):
+            exact = match.group(1) and not match.group(2)
+            if not exact and not match.group(3):
+                found.append(op['details'])
+    return found
+
+
+def check_plan(query, ops):
+    """Plan properties the registry promises for ``query``; returns a list of problems."""
+    problems = []
+    names = {op['name'] for op in ops}
+    for name in sorted(names & set(queries.FORBIDDEN_OPERATORS) - set(query.allow)):
+        problems.append(f"uses {name}")
+    seeks = [op['details'] for op in ops if 'IndexSeek' in op['name']]
+    for label in query.seeks:
+        if not any(f":{label}(" in details for details in seeks):
+            problems.append(f"no index seek on :{label}")
+    for details in unbounded_expands(ops):
+        problems.append(f"unbounded expand {details}")
+    return problems
+
+
+def compare(current, baseline, tolerance):
+    """Regressions of ``current`` against its baseline entry; returns a list of problems."""
+    problems = []
+    for metric in ('estimated_rows', 'db_hits'):
+        before, after = baseline[metric], current[metric]
+        if after > before * (1 + tolerance) and after - before > MIN_DELTA:
+            problems.append(f"{metric} {before:g} -> {after:g}")
+    gained = sorted(set(current['operators']) - set(baseline['operators']))
+    if gained:
+        problems.append(f"plan gained {', '.join(gained)}")
+    return problems
+
+
+def measure(session, query):
+    """EXPLAIN and PROFILE a statement with its sample parameters, then roll back."""
+    cypher = query.sample()
+    tx = session.begin_transaction()
+    try:
+        plan = tx.run('EXPLAIN ' + cypher, query.params).consume().plan
+        profile = tx.run('PROFILE ' + cypher, query.params).consume().profile
+    finally:
+        tx.rollback()
+    plan_ops = operators(plan)
+    profile_ops = operators(profile)
+    return plan_ops, {
+        'operators': sorted({op['name'] for op in plan_ops}),
+        'estimated_rows': round(plan_ops[0]['estimated_rows'], 1),
+        'max_estimated_rows': round(max(op['estimated_rows'] for op in plan_ops), 1),
+        'db_hits': sum(op['db_hits'] for op in profile_ops),
+    }
+
+
+def _batches(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+def load_dataset(session, students, edges, courses, clubs, per_student, batch_size=5000):
+    """Create indexes and a generated campus in an empty database."""
+    for index_query in queries.SCHEMA_INDEXES:
+        session.run(index_query).consume()
+    session.run("CALL db.awaitIndexes(300)").consume()
+
+    adjacency = power_law_graph(students, edges)
+    memberships = campus_memberships(students, courses, clubs, per_student)
+    # Newer students follow older ones, so the early hubs collect followers
+    follows = [{'a': a, 'b': b} for a, neighbors in adjacency.items() for b in neighbors if a > b]
+
+    steps = [
+        ("UNWIND $rows AS sid CREATE (:Student {student_id: sid, name: sid})", list(adjacency)),
+        ("UNWIND $rows AS i CREATE (:Course {code: 'C' + i, name: 'Course ' + i})",
+         [str(i) for i in range(courses)]),
+        ("UNWIND $rows AS i CREATE (:Club {name: 'Club ' + i, description: 'Generated club'})",
+         [str(i) for i in range(clubs)]),
+        ("""
+         UNWIND $rows AS row
+         MATCH (a:Student {student_id: row.a})
+         MATCH (b:Student {student_id: row.b})
+         CREATE (a)-[:FOLLOWS {created_at: datetime()}]->(b)
+         """, follows),
+        ("""
+         UNWIND $rows AS row
+         MATCH (s:Student {student_id: row.student_id})
+         MATCH (c:Course {code: row.item_key})
+         CREATE (s)-[:ENROLLED_IN {created_at: datetime()}]->(c)
+         """, memberships['course']),
+        ("""
+         UNWIND $rows AS row
+         MATCH (s:Student {student_id: row.student_id})
+         MATCH (c:Club {name: row.item_key})
+         CREATE (s)-[:MEMBER_OF {created_at: datetime()}]->(c)
+         """, memberships['club']),
+    ]
+    for cypher, rows in steps:
+        for batch in _batches(rows, batch_size):
+            session.execute_write(lambda tx: tx.run(cypher, {'rows': batch}).consume())
+    return {'students': students, 'follows': len(follows),
+            'enrollments': len(memberships['course']), 'memberships': len(memberships['club'])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--uri', default=os.getenv('NEO4J_URI', 'bolt://localhost:7687'))
+    parser.add_argument('--user', default=os.getenv('NEO4J_USER', 'neo4j'))
+    parser.add_argument('--password', default=os.getenv('NEO4J_PASSWORD', 'password'))
+    parser.add_argument('--database', default=None)
+    parser.add_argument('--students', type=int, default=20000)
+    parser.add_argument('--edges', type=int, default=3)
+    parser.add_argument('--courses', type=int, default=400)
+    parser.add_argument('--clubs', type=int, default=150)
+    parser.add_argument('--per-student', type=int, default=5)
+    parser.add_argument('--reset', action='store_true', help='Wipe the database and load a fresh dataset')
+    parser.add_argument('--no-load', action='store_true', help='Reuse the dataset already in the database')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    parser.add_argument('--update', action='store_true', help='Write the measurements as the new baseline')
+    parser.add_argument('--only', nargs='*', help='Check only these registered statements')
+    args = parser.parse_args()
+
+    dataset = {key: getattr(args, key) for key in ('students', 'edges', 'courses', 'clubs', 'per_student')}
+    driver = GraphDatabase.driver(args.uri, auth=(args.user, args.password))
+    try:
+        with driver.session(database=args.database) as session:
+            existing = session.run("MATCH (n) RETURN count(n) AS count").single()['count']
+            if args.reset and existing:
+                session.run("MATCH (n) CALL { WITH n DETACH DELETE n } IN TRANSACTIONS OF 10000 ROWS").consume()
+                existing = 0
+            if not args.no_load:
+                if existing:
+                    sys.exit("Database is not empty; pass --reset to replace its contents "
+                             "or --no-load to reuse them")
+                started = time.perf_counter()
+                counts = load_dataset(session, **dataset)
+                print(f"Loaded {counts['students']} students, {counts['follows']} follows, "
+                      f"{counts['enrollments']} enrollments, {counts['memberships']} memberships "
+                      f"in {time.perf_counter() - started:.1f}s")
+
+            baseline = {}
+            if os.path.exists(args.baseline):
+                with open(args.baseline) as f:
+                    recorded = json.load(f)
+                if recorded.get('dataset') == dataset:
+                    baseline = recorded['queries']
+                else:
+                    print(f"Baseline was recorded on another dataset ({recorded.get('dataset')}); "
+                          f"record one for this dataset with --update")
+            elif not args.update:
+                print(f"No baseline at {args.baseline}; record one with --update")
+
+            results = {}
+            failures = 0
+            print(f"{'statement':26} {'est. rows':>12} {'db hits':>10}  status")
+            for name, query in queries.QUERIES.items():
+                if args.only and name not in args.only:
+                    continue
+                try:
+                    ops, measured = measure(session, query)
+                except Exception as e:
+                    failures += 1
+                    print(f"{name:26} {'':>12} {'':>10}  ERROR {e}")
+                    continue
+                problems = check_plan(query, ops)
+                if not args.update:
+                    if name in baseline:
+                        problems += compare(measured, baseline[name], args.tolerance)
+                    else:
+                        problems.append("no baseline")
+                results[name] = measured
+                failures += bool(problems)
+                print(f"{name:26} {measured['estimated_rows']:>12g} {measured['db_hits']:>10}  "
+                      f"{'FAIL ' + '; '.join(problems) if problems else 'ok'}")
+    finally:
+        driver.close()
+
+    if args.update:
+        if args.only and baseline:
+            results = {**baseline, **results}
+        with open(args.baseline, 'w') as f:
+            json.dump({'dataset': dataset, 'queries': results}, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+    if failures:
+        sys.exit(f"{failures} statement(s) failed the plan checks")
+
+
+if __name__ == '__main__':
+    main()
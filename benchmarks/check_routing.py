@@ -0,0 +1,186 @@
+# benchmarks/check_routing.py
+"""
+Check read/write routing and bookmark propagation without a cluster.
+
+``StandInCluster`` is a driver stand-in with a mocked routing table: one
+leader and one replica that only applies the leader's writes when a session
+asks it to catch up to a bookmark. Every session records its access mode and
+bookmarks. The check drives the Flask bookmark plumbing from consistency.py
+through ``Neo4jConnection`` and verifies that:
+
+- reads open READ sessions on the replica and writes WRITE sessions on the leader
+- a write returns its bookmark in the header and cookie
+- the next request's read starts from that bookmark and sees the write
+- a client without bookmarks is served the lagging replica
+
+    python -m benchmarks.check_routing
+"""
+import sys
+
+from flask import Flask, jsonify
+from neo4j import Bookmarks, READ_ACCESS, WRITE_ACCESS
+
+import consistency
+from consistency import BOOKMARK_COOKIE, BOOKMARK_HEADER, RequestBookmarks
+from db_connector import Neo4jConnection
+
+CAMPUS = 'north'
+
+
+class _Record(dict):
+    def data(self):
+        return dict(self)
+
+
+class _Transaction:
+    def __init__(self, instance):
+        self._instance = instance
+
+    def run(self, query, parameters=None):
+        return self._instance.run(query, parameters or {})
+
+
+class _Instance:
+    """One cluster member: an append-only list of facts."""
+
+    def __init__(self, name):
+        self.name = name
+        self.facts = []
+
+    def run(self, query, parameters):
+        if query.startswith('WRITE'):
+            self.facts.append(parameters['fact'])
+            return [_Record(applied=len(self.facts))]
+        return [_Record(fact=fact) for fact in self.facts]
+
+
+class StandInSession:
+    def __init__(self, cluster, database, default_access_mode, bookmarks=None):
+        self.cluster = cluster
+        self.database = database
+        self.access_mode = default_access_mode
+        self.bookmarks = set(bookmarks.raw_values) if bookmarks is not None else set()
+        self._last = self.bookmarks
+        cluster.sessions.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def _instance(self):
+        if self.access_mode == WRITE_ACCESS:
+            return self.cluster.leader
+        self.cluster.catch_up(self.bookmarks)
+        return self.cluster.replica
+
+    def run(self, query, parameters=None):
+        return self._instance().run(query, parameters or {})
+
+    def execute_read(self, work):
+        return work(_Transaction(self._instance()))
+
+    def execute_write(self, work):
+        if self.access_mode != WRITE_ACCESS:
+            raise RuntimeError("write transaction in a READ session")
+        result = work(_Transaction(self.cluster.leader))
+        self._last = {f"tx:{len(self.cluster.leader.facts)}"}
+        return result
+
+    def last_bookmarks(self):
+        return Bookmarks.from_raw_values(self._last)
+
+
+class StandInCluster:
+    """Driver stand-in with a fixed routing table: writes to the leader, reads to the replica."""
+
+    def __init__(self):
+        self.leader = _Instance('leader')
+        self.replica = _Instance('replica')
+        self.sessions = []
+
+    def catch_up(self, bookmarks):
+        """Apply leader transactions up to the newest bookmark, as a replica waits for it."""
+        target = max((int(value.split(':')[1]) for value in bookmarks), default=0)
+        self.replica.facts = self.leader.facts[:max(target, len(self.replica.facts))]
+
+    def session(self, database=None, default_access_mode=WRITE_ACCESS, bookmarks=None):
+        return StandInSession(self, database, default_access_mode, bookmarks)
+
+    def close(self):
+        pass
+
+
+def build_app(cluster):
+    app = Flask(__name__)
+    db = Neo4jConnection(database=CAMPUS, bookmarks=RequestBookmarks(), driver=cluster)
+    consistency.init_app(app, lambda: CAMPUS)
+
+    @app.route('/facts', methods=['POST'])
+    def write():
+        return jsonify(db.execute_write_transaction("WRITE $fact", {'fact': 'follow'}))
+
+    @app.route('/facts', methods=['GET'])
+    def read():
+        return jsonify([record['fact'] for record in db.execute_read_transaction("READ")])
+
+    return app
+
+
+def check():
+    """Run the scenario; returns a list of problems."""
+    cluster = StandInCluster()
+    problems = []
+
+    def expect(condition, message):
+        if not condition:
+            problems.append(message)
+
+    with build_app(cluster).test_client() as client:
+        response = client.post('/facts')
+        write_session = cluster.sessions[-1]
+        expect(write_session.access_mode == WRITE_ACCESS, "write did not open a WRITE session")
+        expect(write_session.database == CAMPUS, "write used the wrong database")
+        bookmark = response.headers.get(BOOKMARK_HEADER)
+        expect(bookmark == 'tx:1', f"write returned bookmark header {bookmark!r}")
+        cookie = client.get_cookie(BOOKMARK_COOKIE)
+        expect(cookie is not None and cookie.value == f"{CAMPUS}|tx:1",
+               f"write set bookmark cookie {cookie.value if cookie else None!r}")
+
+        # The test client sends the cookie back, as a browser would
+        facts = client.get('/facts').get_json()
+        read_session = cluster.sessions[-1]
+        expect(read_session.access_mode == READ_ACCESS, "read did not open a READ session")
+        expect(read_session.bookmarks == {'tx:1'},
+               f"read started from bookmarks {sorted(read_session.bookmarks)}")
+        expect(facts == ['follow'], f"read after write saw {facts}")
+        expect(BOOKMARK_HEADER not in client.get('/facts').headers, "a read returned bookmarks")
+
+    # Another client, no bookmarks: its write lands on the leader only
+    with build_app(cluster).test_client() as client:
+        client.post('/facts')
+    with build_app(cluster).test_client() as stranger:
+        facts = stranger.get('/facts').get_json()
+        expect(cluster.sessions[-1].bookmarks == set(), "a client without bookmarks sent some")
+        expect(facts == ['follow'], f"lagging replica served {facts}")
+
+    # The header takes precedence over the cookie for API clients
+    with build_app(cluster).test_client() as api:
+        facts = api.get('/facts', headers={BOOKMARK_HEADER: 'tx:2'}).get_json()
+        expect(cluster.sessions[-1].bookmarks == {'tx:2'}, "header bookmarks were not used")
+        expect(facts == ['follow', 'follow'], f"read with header bookmarks saw {facts}")
+    return problems
+
+
+def main():
+    problems = check()
+    for problem in problems:
+        print(f"FAIL {problem}")
+    if problems:
+        sys.exit(f"{len(problems)} routing check(s) failed")
+    print("Routing and bookmark propagation ok")
+
+
+if __name__ == '__main__':
+    main()
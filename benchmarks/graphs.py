@@ -0,0 +1,72 @@
+# benchmarks/graphs.py
+"""
+Synthetic campus graphs and memberships for the benchmark harness.
+
+Real campus FOLLOWS graphs are heavy-tailed: a few popular students are
+followed by a large share of everyone else. ``power_law_graph`` reproduces
+that shape with preferential attachment (Barabasi-Albert) so benchmarks see
+the same hub-driven frontier blow-up that production queries do.
+``campus_memberships`` does the same for course and club sizes.
+"""
+import random
+
+
+def power_law_graph(num_students, edges_per_student=3, seed=42):
+    """
+    Generate an undirected preferential-attachment graph.
+
+    Args:
+        num_students (int): Number of student nodes
+        edges_per_student (int): Edges each new student attaches with
+        seed (int): Random seed, so runs are comparable
+
+    Returns:
+        dict: ``{student_id: set of neighbor student_ids}``
+    """
+    rng = random.Random(seed)
+    ids = [f"S{i:06d}" for i in range(num_students)]
+    adjacency = {sid: set() for sid in ids}
+    # Every edge endpoint is appended here, so sampling from it picks nodes
+    # proportionally to their degree.
+    endpoints = []
+    seed_size = max(edges_per_student, 2)
+    for i in range(seed_size):
+        for j in range(i + 1, seed_size):
+            adjacency[ids[i]].add(ids[j])
+            adjacency[ids[j]].add(ids[i])
+            endpoints.extend((ids[i], ids[j]))
+    for i in range(seed_size, num_students):
+        new = ids[i]
+        targets = set()
+        while len(targets) < edges_per_student:
+            targets.add(rng.choice(endpoints))
+        for target in targets:
+            adjacency[new].add(target)
+            adjacency[target].add(new)
+            endpoints.extend((new, target))
+    return adjacency
+
+
+def adjacency_neighbors(adjacency):
+    """
+    Wrap an adjacency map in the ``neighbors(ids, fanout)`` interface used by
+    ``graph_search``.
+    """
+    def neighbors(ids, fanout):
+        return {sid: list(adjacency.get(sid, ()))[:fanout] for sid in ids}
+    return neighbors
+
+
+def campus_memberships(students, courses, clubs, per_student, seed=42):
+    """Rows shaped like the incidence queries, with Zipf-distributed item popularity."""
+    rng = random.Random(seed)
+    course_weights = [1.0 / (rank + 1) for rank in range(courses)]
+    club_weights = [1.0 / (rank + 1) ** 0.8 for rank in range(clubs)]
+    rows = {'course': [], 'club': []}
+    for i in range(students):
+        sid = f"S{i:06d}"
+        for c in set(rng.choices(range(courses), course_weights, k=per_student)):
+            rows['course'].append({'student_id': sid, 'student_name': sid, 'item_key': f"C{c}", 'item_name': f"Course {c}"})
+        for c in set(rng.choices(range(clubs), club_weights, k=2)):
+            rows['club'].append({'student_id': sid, 'student_name': sid, 'item_key': f"Club {c}", 'item_name': f"Club {c}"})
+    return rows
@@ -0,0 +1,78 @@
+# consistency.py
+"""
+Causal consistency across read replicas, using Neo4j bookmarks.
+
+After a write, the driver returns a bookmark naming the transaction. Reads
+that start from that bookmark wait until the serving replica has applied it,
+so a student who just followed someone sees the new edge even when the next
+read is served by a replica.
+
+``RequestBookmarks`` is the holder handed to ``Neo4jConnection``. Bookmarks
+travel with the client, so they survive across requests and across app
+instances behind a load balancer:
+
+- incoming: the ``X-Neo4j-Bookmarks`` header, or else the ``nexus_bookmarks``
+  cookie, which browsers send back automatically
+- outgoing: after a request that wrote, both the header and the cookie
+
+The cookie records which campus its bookmarks belong to. Bookmarks from
+another campus's database are ignored.
+"""
+from flask import g, has_request_context, request
+from neo4j import Bookmarks
+
+BOOKMARK_HEADER = 'X-Neo4j-Bookmarks'
+BOOKMARK_COOKIE = 'nexus_bookmarks'
+# Replicas apply writes within seconds; older bookmarks only add latency
+BOOKMARK_COOKIE_MAX_AGE = 300
+
+
+def _parse(value):
+    return {bookmark for bookmark in value.split(',') if bookmark}
+
+
+class RequestBookmarks:
+    """Per-request bookmark holder backed by ``flask.g``."""
+
+    def get(self):
+        if not has_request_context():
+            return None
+        values = g.get('bookmarks')
+        return Bookmarks.from_raw_values(values) if values else None
+
+    def update(self, bookmarks):
+        if not has_request_context() or bookmarks is None:
+            return
+        values = set(bookmarks.raw_values)
+        if values:
+            g.bookmarks = values
+            g.bookmarks_changed = True
+
+
+def init_app(app, campus):
+    """
+    Read client bookmarks before each request and return new ones after it.
+
+    Args:
+        app (Flask): Application
+        campus (callable): Returns the current request's campus key
+    """
+    @app.before_request
+    def load_bookmarks():
+        header = request.headers.get(BOOKMARK_HEADER)
+        if header:
+            g.bookmarks = _parse(header)
+            return
+        cookie = request.cookies.get(BOOKMARK_COOKIE, '')
+        cookie_campus, _, values = cookie.partition('|')
+        if values and cookie_campus == campus():
+            g.bookmarks = _parse(values)
+
+    @app.after_request
+    def send_bookmarks(response):
+        if g.get('bookmarks_changed'):
+            values = ','.join(sorted(g.bookmarks))
+            response.headers[BOOKMARK_HEADER] = values
+            response.set_cookie(BOOKMARK_COOKIE, f"{campus()}|{values}",
+                                max_age=BOOKMARK_COOKIE_MAX_AGE, httponly=True, samesite='Lax')
+        return response
@@ -1,27 +1,46 @@
 # db_connector.py
-from neo4j import GraphDatabase
+from neo4j import GraphDatabase, READ_ACCESS, WRITE_ACCESS
+import copy
 import logging
+import threading
 
 class Neo4jConnection:
     """
     Neo4j database connection handler.
     Provides methods to connect, execute queries, and manage the Neo4j database.
+    
+    With a ``neo4j://`` routing URI the driver keeps the cluster's routing
+    table. ``execute_read_transaction`` then runs on a read replica (or
+    follower) and ``execute_write_transaction`` on the leader. Pass a
+    ``bookmarks`` holder to get causal consistency: every session starts from
+    the holder's bookmarks, and every write hands its new bookmarks back, so
+    a later read waits until the replica has caught up with that write.
     """
     
-    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="password"):
+    def __init__(self, uri="bolt://localhost:7687", user="neo4j", password="password", database=None,
+                 bookmarks=None, driver=None):
         """
         Initialize the Neo4j connection.
         
         Args:
-            uri (str): Neo4j database URI
+            uri (str): Neo4j database URI (``neo4j://`` for cluster routing)
             user (str): Username for authentication
             password (str): Password for authentication
+            database (str): Database to open sessions on (None for the server default)
+            bookmarks: Optional holder with ``get()`` returning ``neo4j.Bookmarks``
+                (or None) and ``update(bookmarks)`` receiving a write's bookmarks
+            driver: Pre-built driver to use instead of creating one, e.g. a
+                stand-in with a mocked routing table
         """
         self._uri = uri
         self._user = user
         self._password = password
-        self._driver = None
+        self._database = database
+        self._bookmarks = bookmarks
+        self._driver = driver
         
+        if driver is not None:
+            return
         try:
             self._driver = GraphDatabase.driver(
                 self._uri, 
@@ -32,6 +51,78 @@ class Neo4jConnection:
             logging.error(f"Failed to connect to Neo4j: {e}")
             raise e
     
+    @property
+    def database(self):
+        return self._database
+    
+    def for_database(self, database):
+        """
+        Return a connection to another database on the same server.
+        
+        The returned connection shares this connection's driver and pool,
+        so closing either one closes both.
+        
+        Args:
+            database (str): Database name
+            
+        Returns:
+            Neo4jConnection: Connection whose sessions use the given database
+        """
+        other = copy.copy(self)
+        other._database = database
+        return other
+    
+    def _session(self, access_mode=WRITE_ACCESS):
+        config = {'database': self._database, 'default_access_mode': access_mode}
+        if self._bookmarks is not None:
+            bookmarks = self._bookmarks.get()
+            if bookmarks is not None:
+                config['bookmarks'] = bookmarks
+        return self._driver.session(**config)
+    
+    def _remember_bookmarks(self, session):
+        if self._bookmarks is not None:
+            self._bookmarks.update(session.last_bookmarks())
+    
+    def warm_pool(self, size):
+        """
+        Open pooled connections before traffic arrives.
+        
+        A session only holds a connection while a transaction runs, so ``size``
+        read transactions are kept open together to make the pool grow to
+        ``size``. A final write transaction also connects to the leader.
+        
+        Args:
+            size (int): Read connections to open; below 1 only the write
+                connection is opened
+        """
+        if size >= 1:
+            self._hold_read_connections(size)
+        with self._session(WRITE_ACCESS) as session:
+            session.execute_write(lambda tx: tx.run("RETURN 1").consume())
+    
+    def _hold_read_connections(self, size):
+        """Run ``size`` read transactions that wait for each other before finishing."""
+        barrier = threading.Barrier(size)
+        errors = []
+        
+        def hold():
+            try:
+                with self._session(READ_ACCESS) as session:
+                    session.execute_read(lambda tx: (tx.run("RETURN 1").consume(), barrier.wait(timeout=30)))
+            except Exception as e:
+                barrier.abort()
+                errors.append(e)
+        
+        threads = [threading.Thread(target=hold, name=f'pool-warmup-{i}') for i in range(size)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        failures = [e for e in errors if not isinstance(e, threading.BrokenBarrierError)]
+        if errors:
+            raise (failures or errors)[0]
+    
     def close(self):
         """Close the database connection."""
         if self._driver is not None:
@@ -53,16 +144,17 @@ class Neo4jConnection:
             parameters = {}
             
         try:
-            with self._driver.session() as session:
-                result = session.run(query, parameters)
-                return [record.data() for record in result]
+            with self._session() as session:
+                records = [record.data() for record in session.run(query, parameters)]
+                self._remember_bookmarks(session)
+                return records
         except Exception as e:
             logging.error(f"Query execution failed: {e}")
             raise e
     
     def execute_write_transaction(self, query, parameters=None):
         """
-        Execute a write transaction.
+        Execute a write transaction on the cluster leader, retrying transient failures.
         
         Args:
             query (str): Cypher query to execute
@@ -75,16 +167,18 @@ class Neo4jConnection:
             parameters = {}
             
         try:
-            with self._driver.session() as session:
-                result = session.write_transaction(lambda tx: tx.run(query, parameters))
-                return [record.data() for record in result]
+            with self._session(WRITE_ACCESS) as session:
+                records = session.execute_write(
+                    lambda tx: [record.data() for record in tx.run(query, parameters)])
+                self._remember_bookmarks(session)
+                return records
         except Exception as e:
             logging.error(f"Write transaction failed: {e}")
             raise e
     
     def execute_read_transaction(self, query, parameters=None):
         """
-        Execute a read transaction.
+        Execute a read transaction, routed to a read replica when available.
         
         Args:
             query (str): Cypher query to execute
@@ -97,9 +191,9 @@ class Neo4jConnection:
             parameters = {}
             
         try:
-            with self._driver.session() as session:
-                result = session.read_transaction(lambda tx: tx.run(query, parameters))
-                return [record.data() for record in result]
+            with self._session(READ_ACCESS) as session:
+                return session.execute_read(
+                    lambda tx: [record.data() for record in tx.run(query, parameters)])
         except Exception as e:
             logging.error(f"Read transaction failed: {e}")
             raise e
\ No newline at end of file
@@ -0,0 +1,283 @@
+# events.py
+"""
+Change-data stream of graph mutations.
+
+Route handlers publish a typed ``MutationEvent`` after each successful write.
+The ``EventBus`` gives it the next offset, appends it to an append-only
+``EventLog`` (JSON lines on local disk, plus an in-memory tail for fast
+replay) and hands it to in-process subscribers: caches, counters and the
+Server-Sent Events stream used by the frontend.
+
+Consumers that fall behind or reconnect replay from the log by offset, so a
+subscriber never has to re-poll list endpoints to learn what changed.
+
+Gunicorn workers on a host can share one ``EVENT_LOG_PATH``. Each append takes
+an exclusive file lock and first reads what other workers appended, so offsets
+stay unique and ordered across workers. Streams read from the log rather than
+from the bus: a local publish wakes them at once, and a short poll of the
+shared file picks up events published by the other workers. Without ``fcntl``
+(Windows) the lock only holds within one process, so give each worker its own
+log there.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STUDENT_CREATED = 'student.created'
+STUDENT_DELETED = 'student.deleted'
+COURSE_CREATED = 'course.created'
+CLUB_CREATED = 'club.created'
+FOLLOW_CREATED = 'follow.created'
+ENROLLMENT_CREATED = 'enrollment.created'
+MEMBERSHIP_CREATED = 'membership.created'
+
+EVENT_TYPES = frozenset({
+    STUDENT_CREATED, STUDENT_DELETED, COURSE_CREATED, CLUB_CREATED,
+    FOLLOW_CREATED, ENROLLMENT_CREATED, MEMBERSHIP_CREATED,
+})
+
+
+class MutationEvent:
+    """
+    A single graph mutation.
+
+    Args:
+        offset (int): Position in the event log, starting at 1
+        type (str): One of ``EVENT_TYPES``
+        data (dict): Event payload, e.g. the ids involved
+        timestamp (float): UNIX time the event was published
+    """
+
+    __slots__ = ('offset', 'type', 'data', 'timestamp')
+
+    def __init__(self, offset, type, data, timestamp):
+        if type not in EVENT_TYPES:
+            raise ValueError(f"Unknown event type: {type}")
+        self.offset = offset
+        self.type = type
+        self.data = data
+        self.timestamp = timestamp
+
+    def to_dict(self):
+        return {'offset': self.offset, 'type': self.type,
+                'timestamp': self.timestamp, 'data': self.data}
+
+    @classmethod
+    def from_dict(cls, record):
+        return cls(record['offset'], record['type'], record['data'], record['timestamp'])
+
+
+class EventLog:
+    """
+    Append-only event log with offsets.
+
+    Args:
+        path (str): JSON-lines file to append to; None keeps events in memory only
+        tail_size (int): Number of recent events kept in memory for replay
+    """
+
+    def __init__(self, path=None, tail_size=10000):
+        self._path = path
+        self._tail = deque(maxlen=tail_size)
+        self._lock = threading.Lock()
+        self._next_offset = 1
+        # Bytes of the file already loaded into the tail
+        self._position = 0
+        self._file = None
+        if path:
+            self._file = open(path, 'ab')
+            self._sync()
+
+    def _sync(self):
+        """Load events appended to the file since the last sync, by any process."""
+        try:
+            if os.path.getsize(self._path) == self._position:
+                return
+        except OSError:
+            return
+        with open(self._path, 'rb') as f:
+            f.seek(self._position)
+            for line in f:
+                # A line without its newline is still being written
+                if not line.endswith(b'\n'):
+                    break
+                self._position += len(line)
+                try:
+                    event = MutationEvent.from_dict(json.loads(line))
+                except (ValueError, KeyError):
+                    logging.warning(f"Skipping corrupt event log line in {self._path}")
+                    continue
+                self._tail.append(event)
+                self._next_offset = event.offset + 1
+
+    @property
+    def last_offset(self):
+        with self._lock:
+            if self._path is not None:
+                self._sync()
+            return self._next_offset - 1
+
+    def append(self, type, data):
+        """Assign the next offset to an event and persist it."""
+        with self._lock:
+            if self._file is None:
+                event = MutationEvent(self._next_offset, type, data, time.time())
+                self._tail.append(event)
+                self._next_offset += 1
+                return event
+            if fcntl is not None:
+                fcntl.flock(self._file, fcntl.LOCK_EX)
+            try:
+                # Other workers may have appended since; continue after their offsets
+                self._sync()
+                event = MutationEvent(self._next_offset, type, data, time.time())
+                line = (json.dumps(event.to_dict(), separators=(',', ':')) + '\n').encode('utf-8')
+                self._file.write(line)
+                self._file.flush()
+                self._position += len(line)
+                self._tail.append(event)
+                self._next_offset += 1
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(self._file, fcntl.LOCK_UN)
+        return event
+
+    def read(self, since=0, limit=1000, match=None):
+        """
+        Events with an offset greater than ``since``, oldest first.
+
+        Args:
+            since (int): Last offset the consumer has seen
+            limit (int): Maximum number of events to return
+            match (callable): Only return events for which ``match(event)`` is true
+
+        Returns:
+            list: MutationEvent objects
+        """
+        if limit < 1:
+            return []
+        with self._lock:
+            if self._path is not None:
+                self._sync()
+            if not self._tail or since + 1 >= self._tail[0].offset or self._path is None:
+                # Offsets are ascending, so walk back from the newest event
+                newer = []
+                for event in reversed(self._tail):
+                    if event.offset <= since:
+                        break
+                    newer.append(event)
+                newer.reverse()
+                return [event for event in newer if match is None or match(event)][:limit]
+
+        # Older than the in-memory tail: scan the file
+        events = []
+        with open(self._path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record.get('offset', 0) > since:
+                    event = MutationEvent.from_dict(record)
+                    if match is not None and not match(event):
+                        continue
+                    events.append(event)
+                    if len(events) >= limit:
+                        break
+        return events
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class EventBus:
+    """In-process pub/sub over an ``EventLog``."""
+
+    def __init__(self, log=None):
+        self.log = log or EventLog()
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, callback, types=None):
+        """
+        Call ``callback(event)`` for every published event.
+
+        Args:
+            callback (callable): Receives a MutationEvent
+            types (iterable): Only deliver these event types; None for all
+
+        Returns:
+            callable: Unsubscribes the callback
+        """
+        entry = (callback, frozenset(types) if types else None)
+        with self._lock:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+    def publish(self, type, **data):
+        """Log an event and deliver it to subscribers."""
+        event = self.log.append(type, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback, types in subscribers:
+            if types is not None and event.type not in types:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logging.error(f"Event subscriber failed on {event.type}: {e}")
+        return event
+
+    def stream(self, since=None, heartbeat_seconds=15, poll_seconds=1.0, batch_size=1000, match=None):
+        """
+        Generate Server-Sent Events, replaying from ``since`` first.
+
+        Only events for which ``match(event)`` is true are sent, if given.
+
+        Events are read from the log in offset order, so a client never gets
+        one twice or out of order. Publishing on this bus wakes the stream at
+        once. Events appended by other workers are found by polling the log
+        every ``poll_seconds``.
+        """
+        wake = threading.Event()
+        unsubscribe = self.subscribe(lambda event: wake.set())
+        try:
+            last = since if since is not None else self.log.last_offset
+            idle = 0.0
+            while True:
+                wake.clear()
+                batch = self.log.read(last, limit=batch_size)
+                for event in batch:
+                    last = event.offset
+                    if match is None or match(event):
+                        yield _format_sse(event)
+                if len(batch) >= batch_size:
+                    continue
+                if batch or wake.wait(poll_seconds):
+                    idle = 0.0
+                    continue
+                idle += poll_seconds
+                if idle >= heartbeat_seconds:
+                    idle = 0.0
+                    yield ': keepalive\n\n'
+        finally:
+            unsubscribe()
+
+
+def _format_sse(event):
+    payload = json.dumps(event.to_dict(), separators=(',', ':'))
+    return f"id: {event.offset}\nevent: {event.type}\ndata: {payload}\n\n"
@@ -1105,5 +1105,39 @@ document.addEventListener('DOMContentLoaded', function() {
         content.innerHTML = html;
     }
     
+    // Real-time notifications pushed by the server (Server-Sent Events).
+    // EventSource reconnects on its own and resumes from the last event id.
+    function connectEventStream() {
+        if (!window.EventSource) {
+            return;
+        }
+        // Event payloads come from other users, so escape them before they reach innerHTML
+        const escapeHTML = value => String(value).replace(/[&<>"']/g, c => ({
+            '&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;', "'": '&#39;'
+        })[c]);
+        const describeEvent = {
+            'student.created': d => `🎓 ${d.name} (${d.student_id}) joined Nexus`,
+            'student.deleted': d => `👋 ${d.student_id} left Nexus`,
+            'course.created': d => `📚 New course: ${d.name} (${d.code})`,
+            'club.created': d => `🎭 New club: ${d.name}`,
+            'follow.created': d => `🤝 ${d.student1_id} followed ${d.student2_id}`,
+            'enrollment.created': d => `📝 ${d.student_id} enrolled in ${d.course_name || d.course_code}`,
+            'membership.created': d => `🎉 ${d.student_id} joined ${d.club_name}`
+        };
+        const source = new EventSource('/api/events/stream');
+        Object.keys(describeEvent).forEach(type => {
+            source.addEventListener(type, function(e) {
+                const event = JSON.parse(e.data);
+                const data = {};
+                Object.keys(event.data).forEach(key => {
+                    data[key] = event.data[key] == null ? '' : escapeHTML(event.data[key]);
+                });
+                showToast(describeEvent[type](data), 'info', 4000);
+            });
+        });
+    }
+
+    connectEventStream();
+
     console.log('🌐 All Nexus event listeners registered successfully');
 });
\ No newline at end of file
@@ -0,0 +1,201 @@
+# graph_search.py
+"""
+Bounded graph searches over the FOLLOWS network.
+
+Both searches treat FOLLOWS as an undirected "knows" relation and never walk
+the graph themselves: they ask a ``neighbors`` callable for the adjacency of a
+whole frontier at once. The callable may be backed by a batched Cypher query
+(see ``cypher_neighbors``) or by an in-process adjacency map, which is what the
+benchmark harness uses.
+
+Every search runs under a ``SearchBudget``. When the budget runs out the search
+stops and returns what it has, flagged with ``complete: False``, instead of
+letting a dense campus graph blow up the request.
+"""
+import logging
+
+import queries
+
+
+class SearchBudget:
+    """
+    Limits applied to a single bounded search.
+
+    Args:
+        max_depth (int): Maximum path length (in hops) to consider
+        max_expansions (int): Maximum number of nodes whose neighbors are fetched
+        max_fanout (int): Maximum neighbors fetched per expanded node
+    """
+
+    def __init__(self, max_depth=6, max_expansions=2000, max_fanout=200):
+        self.max_depth = max(1, int(max_depth))
+        self.max_expansions = max(1, int(max_expansions))
+        self.max_fanout = max(1, int(max_fanout))
+
+    def capped(self, max_depth=None, max_expansions=None, max_fanout=None):
+        """Return a copy narrowed by caller-supplied limits, never widened."""
+        def narrow(limit, requested):
+            return limit if requested is None else min(limit, requested)
+
+        return SearchBudget(
+            max_depth=narrow(self.max_depth, max_depth),
+            max_expansions=narrow(self.max_expansions, max_expansions),
+            max_fanout=narrow(self.max_fanout, max_fanout),
+        )
+
+    def to_dict(self):
+        return {
+            'max_depth': self.max_depth,
+            'max_expansions': self.max_expansions,
+            'max_fanout': self.max_fanout,
+        }
+
+
+
+def cypher_neighbors(db):
+    """
+    Build a ``neighbors`` callable that fetches a frontier in one query.
+
+    Args:
+        db: Neo4jConnection used to run the query
+
+    Returns:
+        callable: ``neighbors(ids, fanout) -> {student_id: [neighbor ids]}``
+    """
+    def neighbors(ids, fanout):
+        if not ids:
+            return {}
+        result = db.execute_read_transaction(queries.SEARCH_NEIGHBORS.cypher, {'ids': list(ids), 'fanout': fanout})
+        return {record['sid']: record['neighbors'] for record in result}
+    return neighbors
+
+
+def _walk(parents, node):
+    """Follow parent links from node back to the search root."""
+    path = []
+    while node is not None:
+        path.append(node)
+        node = parents[node]
+    return path
+
+
+def shortest_path(source, target, neighbors, budget=None):
+    """
+    Bidirectional BFS between two students.
+
+    The smaller frontier is expanded one full level at a time, so the first
+    meeting point found yields a shortest path unless the budget forced a
+    frontier or a fanout to be truncated along the way.
+
+    Args:
+        source: Student id the path starts from
+        target: Student id the path ends at
+        neighbors (callable): ``neighbors(ids, fanout) -> {id: [ids]}``
+        budget (SearchBudget): Search limits; defaults to ``SearchBudget()``
+
+    Returns:
+        dict: ``path`` (list of ids or None), ``length``, ``complete`` (False
+        when the budget cut the search short), ``expanded`` and, for an
+        unfinished search, ``stopped_by``. ``min_length`` (a lower bound on
+        the distance) is only given when every expanded level was complete;
+        after a truncation, unexplored neighbors may hold shorter paths.
+    """
+    budget = budget or SearchBudget()
+    if source == target:
+        return {'path': [source], 'length': 0, 'complete': True, 'expanded': 0}
+
+    parents = ({source: None}, {target: None})
+    frontiers = ([source], [target])
+    depths = [0, 0]
+    expanded = 0
+    truncated = False
+    exhausted = None
+
+    while frontiers[0] and frontiers[1]:
+        if depths[0] + depths[1] >= budget.max_depth:
+            exhausted = 'max_depth'
+            break
+        remaining = budget.max_expansions - expanded
+        if remaining <= 0:
+            exhausted = 'max_expansions'
+            break
+
+        side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+        own, other = parents[side], parents[1 - side]
+        frontier = frontiers[side]
+        if len(frontier) > remaining:
+            frontier = frontier[:remaining]
+            truncated = True
+
+        adjacency = neighbors(frontier, budget.max_fanout)
+        expanded += len(frontier)
+        depths[side] += 1
+
+        meeting = None
+        next_frontier = []
+        for node in frontier:
+            node_neighbors = adjacency.get(node, ())
+            if len(node_neighbors) >= budget.max_fanout:
+                truncated = True
+            for neighbor in node_neighbors:
+                if neighbor in own:
+                    continue
+                own[neighbor] = node
+                next_frontier.append(neighbor)
+                if meeting is None and neighbor in other:
+                    meeting = neighbor
+
+        if meeting is not None:
+            forward = _walk(parents[0], meeting)
+            forward.reverse()
+            backward = _walk(parents[1], meeting)
+            path = forward + backward[1:]
+            return {
+                'path': path,
+                'length': len(path) - 1,
+                'complete': not truncated,
+                'expanded': expanded,
+            }
+
+        frontiers = (next_frontier, frontiers[1]) if side == 0 else (frontiers[0], next_frontier)
+
+    result = {
+        'path': None,
+        'length': None,
+        'complete': exhausted is None and not truncated,
+        'expanded': expanded,
+    }
+    if not result['complete']:
+        result['stopped_by'] = exhausted or 'truncated'
+        if not truncated:
+            result['min_length'] = depths[0] + depths[1] + 1
+    return result
+
+
+def mutual_connections(first, second, neighbors, budget=None):
+    """
+    Students connected to both ``first`` and ``second``.
+
+    Both neighborhoods are fetched in a single batched call and intersected,
+    so the cost is bounded by ``2 * budget.max_fanout`` neighbor rows.
+
+    Args:
+        first: Student id
+        second: Student id
+        neighbors (callable): ``neighbors(ids, fanout) -> {id: [ids]}``
+        budget (SearchBudget): Search limits; defaults to ``SearchBudget()``
+
+    Returns:
+        dict: ``mutuals`` (sorted list of ids) and ``complete`` (False when
+        either neighborhood hit the fanout cap, so more mutuals may exist)
+    """
+    budget = budget or SearchBudget()
+    adjacency = neighbors([first, second], budget.max_fanout)
+    first_neighbors = adjacency.get(first, ())
+    second_neighbors = adjacency.get(second, ())
+    mutuals = (set(first_neighbors) & set(second_neighbors)) - {first, second}
+    complete = (len(first_neighbors) < budget.max_fanout
+                and len(second_neighbors) < budget.max_fanout)
+    if not complete:
+        logging.info(f"Mutual search {first}/{second} truncated at fanout {budget.max_fanout}")
+    return {'mutuals': sorted(mutuals), 'complete': complete}
@@ -0,0 +1,126 @@
+# jobs.py
+"""
+Precomputation jobs run by the scheduler.
+
+Each job reads one campus through ``db`` and returns a JSON-serializable
+snapshot. The scheduler stores that snapshot so every worker can serve it.
+Endpoints compute the same result live while no snapshot exists yet.
+"""
+import time
+
+import queries
+
+
+def schema_stats(db):
+    """
+    Node and relationship counts per label and type, with sample properties.
+
+    Args:
+        db: Connection to one campus database
+
+    Returns:
+        dict: ``{nodes, relationships, statistics}`` as served by ``/api/schema/simple``
+    """
+    schema_info = {
+        "nodes": {},
+        "relationships": {},
+        "statistics": {}
+    }
+
+    # Get node labels and their basic info
+    labels_result = db.execute_read_transaction(queries.LABELS.cypher)
+    labels = labels_result[0]['labels'] if labels_result else []
+
+    for label in labels:
+        # Get count and sample properties
+        count_result = db.execute_read_transaction(queries.LABEL_COUNT.render(label=label))
+        count = count_result[0]['count'] if count_result else 0
+
+        # Get sample properties from first node
+        props_result = db.execute_read_transaction(queries.LABEL_SAMPLE_PROPERTIES.render(label=label))
+        properties = props_result[0]['props'] if props_result else []
+
+        schema_info["nodes"][label] = {
+            "count": int(count),
+            "properties": list(properties)
+        }
+
+    # Get relationship types and counts
+    rel_result = db.execute_read_transaction(queries.RELATIONSHIP_TYPES.cypher)
+    rel_types = rel_result[0]['types'] if rel_result else []
+
+    for rel_type in rel_types:
+        count_result = db.execute_read_transaction(queries.RELATIONSHIP_COUNT.render(rel_type=rel_type))
+        count = count_result[0]['count'] if count_result else 0
+
+        schema_info["relationships"][rel_type] = {
+            "count": int(count)
+        }
+
+    # Basic statistics
+    total_nodes_result = db.execute_read_transaction(queries.TOTAL_NODES.cypher)
+    total_nodes = total_nodes_result[0]['total'] if total_nodes_result else 0
+
+    total_rels_result = db.execute_read_transaction(queries.TOTAL_RELATIONSHIPS.cypher)
+    total_rels = total_rels_result[0]['total'] if total_rels_result else 0
+
+    schema_info["statistics"] = {
+        "total_nodes": int(total_nodes),
+        "total_relationships": int(total_rels),
+        "node_types": len(labels),
+        "relationship_types": len(rel_types)
+    }
+    return schema_info
+
+
+def leaderboards(db, limit=10):
+    """
+    Most popular courses, largest clubs and most followed students.
+
+    Args:
+        db: Connection to one campus database
+        limit (int): Entries per leaderboard
+
+    Returns:
+        dict: ``{courses, clubs, most_followed}``
+    """
+    return {
+        'courses': db.execute_read_transaction(queries.POPULAR_COURSES.cypher, {'limit': limit}),
+        'clubs': db.execute_read_transaction(queries.LARGEST_CLUBS.cypher, {'limit': limit}),
+        'most_followed': db.execute_read_transaction(queries.MOST_FOLLOWED.cypher, {'limit': limit}),
+    }
+
+
+def recommendations(db, engine, previous=None, max_age_seconds=86400):
+    """
+    Rebuild the "students like you" store when memberships have changed.
+
+    The store is saved to ``engine.path``, where every worker picks it up.
+    Between rebuilds the job only reads three counts, so it is cheap to run
+    often. Changes that leave the counts equal (one enrollment swapped for
+    another) are picked up once the store is ``max_age_seconds`` old.
+
+    Args:
+        db: Connection to one campus database
+        engine (RecommendationEngine): Engine of that campus
+        previous (dict): This job's last result, if any
+        max_age_seconds (float): Rebuild at least this often
+
+    Returns:
+        dict: ``{students, items, metric, built_at, signature}`` of the saved store
+    """
+    counts = db.execute_read_transaction(queries.MEMBERSHIP_COUNTS.cypher)
+    signature = dict(counts[0]) if counts else {}
+    store = engine.current()
+    if (previous and previous.get('signature') == signature and store is not None
+            and store.metric == engine.metric and store.neighbors.shape[1] == engine.k
+            and time.time() - store.built_at < max_age_seconds):
+        return previous
+    store = engine.build(db)
+    return {
+        'students': len(store.student_ids),
+        'items': len(store.item_names),
+        'metric': store.metric,
+        'built_at': store.built_at,
+        'signature': signature,
+    }
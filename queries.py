@@ -0,0 +1,352 @@
+# queries.py
+"""
+Named registry of the Cypher statements issued by the API.
+
+Every statement is a ``NamedQuery`` constant. It records the plan properties
+the statement must keep: the labels it reaches through an index seek, and the
+normally forbidden operators (full scans, cartesian products) it is allowed to
+use. ``python -m benchmarks.check_query_plans`` EXPLAINs and PROFILEs every
+registered statement against a generated campus and fails when one of those
+properties breaks, or when estimated rows or db hits regress against the
+recorded baseline.
+
+Statements that embed a label or relationship type (the schema endpoints) are
+templates; ``render`` fills them in.
+"""
+
+# Operators that touch every node or relationship of a label/type or the whole graph
+FULL_SCANS = (
+    'AllNodesScan',
+    'NodeByLabelScan',
+    'DirectedAllRelationshipsScan',
+    'UndirectedAllRelationshipsScan',
+    'DirectedRelationshipTypeScan',
+    'UndirectedRelationshipTypeScan',
+)
+
+# Operators a statement may only use if it lists them in ``allow``
+FORBIDDEN_OPERATORS = FULL_SCANS + ('CartesianProduct',)
+
+READ = 'read'
+WRITE = 'write'
+
+QUERIES = {}
+
+
+class NamedQuery:
+    """
+    A registered Cypher statement and the plan it is expected to keep.
+
+    Args:
+        name (str): Registry key
+        cypher (str): Statement text, or a ``str.format`` template
+        access (str): READ or WRITE
+        params (dict): Sample parameters for plan checks on the generated dataset
+        seeks (tuple): Labels that must be reached through an index seek
+        allow (tuple): Forbidden operators this statement may still use
+        template_args (dict): Sample template arguments for plan checks
+    """
+
+    __slots__ = ('name', 'cypher', 'access', 'params', 'seeks', 'allow', 'template_args')
+
+    def __init__(self, name, cypher, access=READ, params=None, seeks=(), allow=(),
+                 template_args=None):
+        self.name = name
+        self.cypher = cypher
+        self.access = access
+        self.params = params or {}
+        self.seeks = tuple(seeks)
+        self.allow = tuple(allow)
+        self.template_args = template_args
+
+    def render(self, **kwargs):
+        """Fill in a template's label or relationship type."""
+        return self.cypher.format(**kwargs)
+
+    def sample(self):
+        """Statement text for plan checks, with sample template arguments filled in."""
+        if self.template_args is None:
+            return self.cypher
+        return self.render(**self.template_args)
+
+    def __repr__(self):
+        return f"NamedQuery({self.name!r})"
+
+
+def register(name, cypher, **kwargs):
+    """Create a ``NamedQuery`` and add it to ``QUERIES``."""
+    if name in QUERIES:
+        raise ValueError(f"Query '{name}' is already registered")
+    query = QUERIES[name] = NamedQuery(name, cypher, **kwargs)
+    return query
+
+
+# Sample keys present in the generated dataset (see benchmarks/check_query_plans.py)
+_STUDENT = 'S000000'
+_OTHER_STUDENT = 'S000001'
+_COURSE = 'C0'
+_CLUB = 'Club 0'
+
+# Lookup indexes, created in every campus database
+SCHEMA_INDEXES = [
+    "CREATE INDEX student_id IF NOT EXISTS FOR (s:Student) ON (s.student_id)",
+    "CREATE INDEX course_code IF NOT EXISTS FOR (c:Course) ON (c.code)",
+    "CREATE INDEX club_name IF NOT EXISTS FOR (c:Club) ON (c.name)",
+    "CREATE INDEX enrolled_at IF NOT EXISTS FOR ()-[r:ENROLLED_IN]-() ON (r.created_at)",
+    "CREATE INDEX member_of_at IF NOT EXISTS FOR ()-[r:MEMBER_OF]-() ON (r.created_at)"
+]
+
+# CRUD
+
+CREATE_STUDENT = register('create_student', """
+    CREATE (s:Student {name: $name, student_id: $student_id})
+    RETURN s
+    """, access=WRITE, params={'name': 'Plan Check', 'student_id': 'S_PLAN_CHECK'})
+
+CREATE_COURSE = register('create_course', """
+    CREATE (c:Course {name: $name, code: $code})
+    RETURN c
+    """, access=WRITE, params={'name': 'Plan Check', 'code': 'PLAN101'})
+
+CREATE_CLUB = register('create_club', """
+    CREATE (c:Club {name: $name, description: $description})
+    RETURN c
+    """, access=WRITE, params={'name': 'Plan Check Club', 'description': 'Plan check'})
+
+GET_STUDENT = register('get_student', """
+    MATCH (s:Student {student_id: $student_id})
+    RETURN s
+    """, params={'student_id': _STUDENT}, seeks=('Student',))
+
+DELETE_STUDENT = register('delete_student', """
+    MATCH (s:Student {student_id: $student_id})
+    DETACH DELETE s
+    RETURN count(s) as deleted_count
+    """, access=WRITE, params={'student_id': _STUDENT}, seeks=('Student',))
+
+# Relationships. Each joins two point lookups, which is a cartesian product of
+# one row by one row.
+
+CREATE_FOLLOW = register('create_follow', """
+    MATCH (s1:Student {student_id: $student1_id})
+    MATCH (s2:Student {student_id: $student2_id})
+    CREATE (s1)-[:FOLLOWS {created_at: datetime()}]->(s2)
+    RETURN s1, s2
+    """, access=WRITE, params={'student1_id': _STUDENT, 'student2_id': _OTHER_STUDENT},
+    seeks=('Student',), allow=('CartesianProduct',))
+
+CREATE_ENROLLMENT = register('create_enrollment', """
+    MATCH (s:Student {student_id: $student_id})
+    MATCH (c:Course {code: $course_code})
+    CREATE (s)-[:ENROLLED_IN {created_at: datetime()}]->(c)
+    RETURN s, c
+    """, access=WRITE, params={'student_id': _STUDENT, 'course_code': _COURSE},
+    seeks=('Student', 'Course'), allow=('CartesianProduct',))
+
+CREATE_MEMBERSHIP = register('create_membership', """
+    MATCH (s:Student {student_id: $student_id})
+    MATCH (c:Club {name: $club_name})
+    CREATE (s)-[:MEMBER_OF {created_at: datetime()}]->(c)
+    RETURN s, c
+    """, access=WRITE, params={'student_id': _STUDENT, 'club_name': _CLUB},
+    seeks=('Student', 'Club'), allow=('CartesianProduct',))
+
+# Neighborhoods
+
+# Neighbor lists for several students at once, shaped for the adjacency cache.
+# Unknown students produce no row, so they are never cached.
+
+STUDENT_FOLLOWING = register('student_following', """
+    UNWIND $ids AS sid
+    MATCH (s:Student {student_id: sid})
+    OPTIONAL MATCH (s)-[:FOLLOWS]->(followed:Student)
+    RETURN sid as student_id, collect(DISTINCT followed {.student_id, .name}) as neighbors
+    """, params={'ids': [_STUDENT, _OTHER_STUDENT]}, seeks=('Student',))
+
+STUDENT_FOLLOWERS = register('student_followers', """
+    UNWIND $ids AS sid
+    MATCH (s:Student {student_id: sid})
+    OPTIONAL MATCH (follower:Student)-[:FOLLOWS]->(s)
+    RETURN sid as student_id, collect(DISTINCT follower {.student_id, .name}) as neighbors
+    """, params={'ids': [_STUDENT, _OTHER_STUDENT]}, seeks=('Student',))
+
+# Undirected FOLLOWS neighbors of a search frontier, at most $fanout per student
+SEARCH_NEIGHBORS = register('search_neighbors', """
+    UNWIND $ids AS sid
+    MATCH (s:Student {student_id: sid})
+    CALL {
+        WITH s
+        MATCH (s)-[:FOLLOWS]-(n:Student)
+        RETURN DISTINCT n.student_id AS nid
+        LIMIT $fanout
+    }
+    RETURN sid, collect(nid) AS neighbors
+    """, params={'ids': [_STUDENT, _OTHER_STUDENT], 'fanout': 200}, seeks=('Student',))
+
+COURSE_STUDENTS = register('course_students', """
+    MATCH (s:Student)-[:ENROLLED_IN]->(c:Course {code: $course_code})
+    RETURN s
+    """, params={'course_code': _COURSE}, seeks=('Course',))
+
+CLUB_MEMBERS = register('club_members', """
+    MATCH (s:Student)-[:MEMBER_OF]->(c:Club {name: $club_name})
+    RETURN s
+    """, params={'club_name': _CLUB}, seeks=('Club',))
+
+# Students reached through a shared course or club; the only ones with a
+# common interest, so there is no need to pair the student with everyone.
+COMMON_INTERESTS = register('common_interests', """
+    MATCH (s:Student {student_id: $student_id})
+    CALL {
+        WITH s
+        MATCH (s)-[:ENROLLED_IN]->(course:Course)<-[:ENROLLED_IN]-(other:Student)
+        WHERE other <> s
+        RETURN other, course.name as course_name, null as club_name
+        UNION ALL
+        WITH s
+        MATCH (s)-[:MEMBER_OF]->(club:Club)<-[:MEMBER_OF]-(other:Student)
+        WHERE other <> s
+        RETURN other, null as course_name, club.name as club_name
+    }
+    WITH other, collect(DISTINCT course_name) as common_courses,
+         collect(DISTINCT club_name) as common_clubs
+    RETURN other.name as student_name,
+           other.student_id as student_id,
+           common_courses,
+           common_clubs,
+           (size(common_courses) + size(common_clubs)) as total_common_interests
+    ORDER BY total_common_interests DESC
+    """, params={'student_id': _STUDENT}, seeks=('Student',))
+
+STUDENT_SUMMARIES = register('student_summaries', """
+    UNWIND $ids AS sid
+    MATCH (s:Student {student_id: sid})
+    RETURN s.student_id as student_id, s.name as name
+    """, params={'ids': [_STUDENT, _OTHER_STUDENT]}, seeks=('Student',))
+
+# Analytics
+
+POPULAR_COURSES = register('popular_courses', """
+    MATCH (s:Student)-[:ENROLLED_IN]->(c:Course)
+    RETURN c, COUNT(s) as student_count
+    ORDER BY student_count DESC
+    LIMIT $limit
+    """, params={'limit': 10}, allow=FULL_SCANS)
+
+LARGEST_CLUBS = register('largest_clubs', """
+    MATCH (s:Student)-[:MEMBER_OF]->(c:Club)
+    RETURN c, COUNT(s) as member_count
+    ORDER BY member_count DESC
+    LIMIT $limit
+    """, params={'limit': 10}, allow=FULL_SCANS)
+
+MOST_FOLLOWED = register('most_followed', """
+    MATCH (follower:Student)-[:FOLLOWS]->(s:Student)
+    RETURN s.student_id as student_id, s.name as name, COUNT(follower) as follower_count
+    ORDER BY follower_count DESC
+    LIMIT $limit
+    """, params={'limit': 10}, allow=FULL_SCANS)
+
+# Recommendations: the whole student x (course U club) incidence matrix
+
+COURSE_INCIDENCE = register('course_incidence', """
+    MATCH (s:Student)-[:ENROLLED_IN]->(c:Course)
+    RETURN s.student_id AS student_id, s.name AS student_name, c.code AS item_key, c.name AS item_name
+    """, allow=FULL_SCANS)
+
+CLUB_INCIDENCE = register('club_incidence', """
+    MATCH (s:Student)-[:MEMBER_OF]->(c:Club)
+    RETURN s.student_id AS student_id, s.name AS student_name, c.name AS item_key, c.name AS item_name
+    """, allow=FULL_SCANS)
+
+# Counted from the count store; the recommendations job rebuilds when they change
+MEMBERSHIP_COUNTS = register('membership_counts', """
+    CALL { MATCH (s:Student) RETURN count(s) as students }
+    CALL { MATCH ()-[r:ENROLLED_IN]->() RETURN count(r) as enrollments }
+    CALL { MATCH ()-[r:MEMBER_OF]->() RETURN count(r) as memberships }
+    RETURN students, enrollments, memberships
+    """)
+
+# Trending: joins per course/club and time bucket since the start of the window,
+# found through the relationship timestamp indexes
+
+TRENDING_COURSE_JOINS = register('trending_course_joins', """
+    MATCH (:Student)-[r:ENROLLED_IN]->(c:Course)
+    WHERE r.created_at >= datetime({epochSeconds: $since})
+    RETURN c.code as key, c.name as name,
+           r.created_at.epochSeconds / $bucket_seconds as bucket, count(*) as joins
+    """, params={'since': 0, 'bucket_seconds': 3600}, seeks=('ENROLLED_IN',))
+
+TRENDING_CLUB_JOINS = register('trending_club_joins', """
+    MATCH (:Student)-[r:MEMBER_OF]->(c:Club)
+    WHERE r.created_at >= datetime({epochSeconds: $since})
+    RETURN c.name as key, c.name as name,
+           r.created_at.epochSeconds / $bucket_seconds as bucket, count(*) as joins
+    """, params={'since': 0, 'bucket_seconds': 3600}, seeks=('MEMBER_OF',))
+
+# Schema introspection. These describe the whole database, so scans are expected.
+
+LABELS = register('labels', """
+    CALL db.labels() YIELD label
+    RETURN collect(label) as labels
+    """)
+
+LABEL_PROPERTIES = register('label_properties', """
+    MATCH (n:{label})
+    WITH keys(n) as keys
+    UNWIND keys as key
+    RETURN DISTINCT key
+    ORDER BY key
+    """, allow=FULL_SCANS, template_args={'label': 'Student'})
+
+LABEL_SAMPLE_PROPERTIES = register(
+    'label_sample_properties', "MATCH (n:{label}) RETURN keys(n) as props LIMIT 1",
+    allow=FULL_SCANS, template_args={'label': 'Student'})
+
+LABEL_COUNT = register(
+    'label_count', "MATCH (n:{label}) RETURN count(n) as count",
+    template_args={'label': 'Student'})
+
+RELATIONSHIP_TYPES = register('relationship_types', """
+    CALL db.relationshipTypes() YIELD relationshipType
+    RETURN collect(relationshipType) as types
+    """)
+
+RELATIONSHIP_PATTERNS = register('relationship_patterns', """
+    MATCH (a)-[r:{rel_type}]->(b)
+    WITH labels(a) as startLabels, labels(b) as endLabels, count(r) as count
+    RETURN startLabels[0] as startLabel, endLabels[0] as endLabel, count
+    """, allow=FULL_SCANS, template_args={'rel_type': 'FOLLOWS'})
+
+RELATIONSHIP_COUNT = register(
+    'relationship_count', "MATCH ()-[r:{rel_type}]->() RETURN count(r) as count",
+    template_args={'rel_type': 'FOLLOWS'})
+
+SHOW_CONSTRAINTS = register('show_constraints', "SHOW CONSTRAINTS")
+
+SHOW_INDEXES = register('show_indexes', "SHOW INDEXES")
+
+# Two grouping-free counts, so both are answered from the count store
+GRAPH_STATISTICS = register('graph_statistics', """
+    CALL { MATCH (n) RETURN count(n) as totalNodes }
+    CALL { MATCH ()-[r]->() RETURN count(r) as totalRelationships }
+    RETURN totalNodes, totalRelationships
+    """)
+
+TOTAL_NODES = register('total_nodes', "MATCH (n) RETURN count(n) as total")
+
+TOTAL_RELATIONSHIPS = register('total_relationships', "MATCH ()-[r]->() RETURN count(r) as total")
+
+VISUAL_RELATIONSHIPS = register('visual_relationships', """
+    MATCH (a)-[r]->(b)
+    WITH labels(a)[0] as sourceLabel, type(r) as relationshipType, labels(b)[0] as targetLabel, count(r) as count
+    RETURN sourceLabel, relationshipType, targetLabel, count
+    ORDER BY count DESC
+    """, allow=FULL_SCANS)
+
+VISUAL_NODES = register('visual_nodes', """
+    MATCH (n)
+    WITH labels(n)[0] as label, count(n) as count
+    RETURN label, count
+    ORDER BY count DESC
+    """, allow=FULL_SCANS)
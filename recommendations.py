@@ -0,0 +1,300 @@
+# recommendations.py
+"""
+"Students like you" recommendations from shared courses and clubs.
+
+The build step loads the graph as a sparse student x (course U club) incidence
+matrix and computes student-student similarity with batched sparse matrix
+products, keeping the top K neighbors of every student. The result is held
+in a ``NeighborStore``: a few NumPy arrays plus an id-interning table. One
+process builds it and saves the arrays to an ``.npz`` file; every worker
+loads that file and swaps in a new store when it is replaced. Requests only
+index into those arrays.
+
+Supported metrics:
+
+- ``jaccard``: shared items / items in either profile
+- ``cosine``: cosine similarity of binary profiles
+- ``idf`` (default): cosine similarity of IDF-weighted profiles, so a shared
+  niche club outweighs a shared 500-student intro course
+"""
+import logging
+import os
+import threading
+import time
+
+import numpy as np
+from scipy import sparse
+
+import queries
+
+METRICS = ('jaccard', 'cosine', 'idf')
+
+INCIDENCE_QUERIES = {
+    'course': queries.COURSE_INCIDENCE,
+    'club': queries.CLUB_INCIDENCE,
+}
+
+
+class NeighborStore:
+    """
+    Precomputed top-K neighbors in array form.
+
+    Args:
+        student_ids (list): Student id for each matrix row
+        student_names (list): Student name for each matrix row
+        item_names (list): Display name for each matrix column
+        item_kinds (np.ndarray): 0 for a course column, 1 for a club column
+        incidence (sparse.csr_matrix): Binary student x item matrix
+        neighbors (np.ndarray): int32 (students, K) row indices, -1 padded
+        scores (np.ndarray): float32 (students, K) similarities
+        metric (str): Metric the scores were computed with
+        built_at (float): When the scores were computed; defaults to now
+    """
+
+    def __init__(self, student_ids, student_names, item_names, item_kinds, incidence,
+                 neighbors, scores, metric, built_at=None):
+        self.student_ids = student_ids
+        self.student_names = student_names
+        self.index = {sid: row for row, sid in enumerate(student_ids)}
+        self.item_names = item_names
+        self.item_kinds = item_kinds
+        self.incidence = incidence
+        self.neighbors = neighbors
+        self.scores = scores
+        self.metric = metric
+        self.built_at = time.time() if built_at is None else built_at
+
+    def _items(self, row):
+        start, stop = self.incidence.indptr[row], self.incidence.indptr[row + 1]
+        return self.incidence.indices[start:stop]
+
+    def similar(self, student_id, limit=10):
+        """
+        Most similar students with the courses and clubs they share.
+
+        Returns:
+            list: Dicts ordered by descending score; empty for unknown students
+        """
+        row = self.index.get(student_id)
+        if row is None or limit < 1:
+            return []
+        own = self._items(row)
+        results = []
+        for neighbor, score in zip(self.neighbors[row][:limit], self.scores[row][:limit]):
+            if neighbor < 0:
+                break
+            shared = np.intersect1d(own, self._items(neighbor), assume_unique=True)
+            results.append({
+                'student_id': self.student_ids[neighbor],
+                'student_name': self.student_names[neighbor],
+                'score': round(float(score), 4),
+                'common_courses': [self.item_names[i] for i in shared if self.item_kinds[i] == 0],
+                'common_clubs': [self.item_names[i] for i in shared if self.item_kinds[i] == 1],
+            })
+        return results
+
+    def memory_bytes(self):
+        return int(self.neighbors.nbytes + self.scores.nbytes + self.incidence.data.nbytes
+                   + self.incidence.indices.nbytes + self.incidence.indptr.nbytes)
+
+    def save(self, path):
+        """Write the arrays to an ``.npz`` file, replacing it atomically."""
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'wb') as f:
+            np.savez(
+                f,
+                student_ids=np.array(self.student_ids, dtype=str),
+                student_names=np.array([name or '' for name in self.student_names], dtype=str),
+                student_named=np.array([name is not None for name in self.student_names], dtype=bool),
+                item_names=np.array(self.item_names, dtype=str),
+                item_kinds=self.item_kinds,
+                incidence_data=self.incidence.data,
+                incidence_indices=self.incidence.indices,
+                incidence_indptr=self.incidence.indptr,
+                incidence_shape=np.array(self.incidence.shape, dtype=np.int64),
+                neighbors=self.neighbors,
+                scores=self.scores,
+                metric=np.array(self.metric),
+                built_at=np.array(self.built_at, dtype=np.float64),
+            )
+        os.replace(temp, path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a store written by ``save``."""
+        with np.load(path) as arrays:
+            incidence = sparse.csr_matrix(
+                (arrays['incidence_data'], arrays['incidence_indices'], arrays['incidence_indptr']),
+                shape=tuple(arrays['incidence_shape']),
+            )
+            student_names = [name if named else None
+                             for name, named in zip(arrays['student_names'].tolist(), arrays['student_named'])]
+            return cls(arrays['student_ids'].tolist(), student_names, arrays['item_names'].tolist(),
+                       arrays['item_kinds'], incidence, arrays['neighbors'], arrays['scores'],
+                       str(arrays['metric']), float(arrays['built_at']))
+
+
+def build_incidence(rows_by_kind):
+    """
+    Turn (student_id, student_name, item_key, item_name) rows into a binary CSR matrix.
+
+    Args:
+        rows_by_kind (dict): ``{'course': [...], 'club': [...]}`` of query rows
+
+    Returns:
+        tuple: (student_ids, student_names, item_names, item_kinds, csr_matrix)
+    """
+    student_index, item_index = {}, {}
+    student_names = []
+    item_names, item_kinds = [], []
+    row_idx, col_idx = [], []
+    for kind_code, kind in enumerate(('course', 'club')):
+        for record in rows_by_kind.get(kind, ()):
+            sid = record['student_id']
+            row = student_index.get(sid)
+            if row is None:
+                row = student_index[sid] = len(student_names)
+                student_names.append(record.get('student_name'))
+            item_key = (kind, record['item_key'])
+            col = item_index.get(item_key)
+            if col is None:
+                col = item_index[item_key] = len(item_names)
+                item_names.append(record['item_name'] or record['item_key'])
+                item_kinds.append(kind_code)
+            row_idx.append(row)
+            col_idx.append(col)
+
+    student_ids = list(student_index)
+    matrix = sparse.csr_matrix(
+        (np.ones(len(row_idx), dtype=np.float32), (row_idx, col_idx)),
+        shape=(len(student_ids), len(item_names)),
+    )
+    # Duplicate edges would sum above 1; keep the matrix binary
+    matrix.data[:] = 1.0
+    return student_ids, student_names, item_names, np.array(item_kinds, dtype=np.int8), matrix
+
+
+def top_k_similar(incidence, metric='idf', k=20, batch_size=512):
+    """
+    Top-K most similar rows for every row of a binary incidence matrix.
+
+    Similarities are computed one block of rows at a time
+    (``block @ matrix.T``), so peak memory scales with the batch size and
+    the item popularity instead of with students squared.
+
+    Returns:
+        tuple: (neighbors int32 array, scores float32 array), both (n, k)
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}")
+    n = incidence.shape[0]
+    neighbors = np.full((n, k), -1, dtype=np.int32)
+    scores = np.zeros((n, k), dtype=np.float32)
+    if n == 0:
+        return neighbors, scores
+
+    degree = np.asarray(incidence.sum(axis=1)).ravel()
+    weighted = incidence
+    if metric != 'jaccard':
+        if metric == 'idf':
+            df = np.asarray(incidence.sum(axis=0)).ravel()
+            idf = np.log((1.0 + n) / (1.0 + df)) + 1.0
+            weighted = incidence @ sparse.diags(idf.astype(np.float32))
+        norms = np.sqrt(np.asarray(weighted.multiply(weighted).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        weighted = sparse.diags((1.0 / norms).astype(np.float32)) @ weighted
+    weighted = sparse.csr_matrix(weighted, dtype=np.float32)
+    transposed = weighted.T.tocsr()
+
+    for start in range(0, n, batch_size):
+        stop = min(start + batch_size, n)
+        block = weighted[start:stop] @ transposed
+        rows = np.repeat(np.arange(start, stop), np.diff(block.indptr))
+        values = block.data
+        if metric == 'jaccard':
+            union = degree[rows] + degree[block.indices] - values
+            values = values / np.maximum(union, 1.0)
+        # A student is not their own neighbor; real similarities are all > 0
+        values[block.indices == rows] = -1.0
+        for offset in range(stop - start):
+            lo, hi = block.indptr[offset], block.indptr[offset + 1]
+            if lo == hi:
+                continue
+            row_values = values[lo:hi]
+            row_cols = block.indices[lo:hi]
+            if hi - lo > k:
+                top = np.argpartition(-row_values, k)[:k]
+                row_values, row_cols = row_values[top], row_cols[top]
+            order = np.argsort(-row_values, kind='stable')
+            order = order[row_values[order] > 0]
+            neighbors[start + offset, :len(order)] = row_cols[order]
+            scores[start + offset, :len(order)] = row_values[order]
+    return neighbors, scores
+
+
+class RecommendationEngine:
+    """
+    Builds a ``NeighborStore`` into a shared file and serves it.
+
+    ``build`` is run by one scheduled job per campus. Every worker serves the
+    last saved store and reloads it when the file is replaced, so the matrix
+    products run once per rebuild instead of once per worker.
+
+    Args:
+        metric (str): One of ``METRICS``
+        k (int): Neighbors precomputed per student
+        path (str): ``.npz`` file the store is saved to and loaded from
+    """
+
+    def __init__(self, metric='idf', k=20, path='recommendations.npz'):
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of {METRICS}")
+        self.metric = metric
+        self.k = k
+        self.path = path
+        self.store = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def build(self, db):
+        """Load the incidence matrix from the graph, recompute neighbors and save the store."""
+        started = time.perf_counter()
+        rows = {kind: db.execute_read_transaction(query.cypher) for kind, query in INCIDENCE_QUERIES.items()}
+        student_ids, student_names, item_names, item_kinds, incidence = build_incidence(rows)
+        neighbors, scores = top_k_similar(incidence, self.metric, self.k)
+        store = NeighborStore(student_ids, student_names, item_names, item_kinds,
+                              incidence, neighbors, scores, self.metric)
+        store.save(self.path)
+        with self._lock:
+            self.store, self._mtime = store, os.stat(self.path).st_mtime_ns
+        logging.info(f"Recommendations rebuilt for {len(student_ids)} students, "
+                     f"{len(item_names)} items in {time.perf_counter() - started:.2f}s")
+        return store
+
+    def current(self):
+        """
+        The latest saved store, reloaded if another process replaced the file.
+
+        Returns:
+            NeighborStore: None until a store has been built
+        """
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return self.store
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        self.store = NeighborStore.load(self.path)
+                    except (OSError, ValueError, KeyError) as e:
+                        logging.warning(f"Could not load recommendations from {self.path}: {e}")
+                    # Not retried until the file changes again
+                    self._mtime = mtime
+        return self.store
+
+    def similar(self, student_id, limit=10):
+        store = self.current()
+        if store is None:
+            return None
+        return store.similar(student_id, min(limit, self.k))
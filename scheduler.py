@@ -0,0 +1,367 @@
+# scheduler.py
+"""
+In-process scheduler for periodic precomputation and maintenance jobs.
+
+Jobs have a cron-like schedule (``*/10 * * * *``, ``@hourly`` or
+``@every 30s``). A ticker thread hands due jobs to a bounded worker pool. A job
+never overlaps itself, so the pool queue is bounded by the number of jobs.
+
+Every gunicorn worker runs its own scheduler. A non-blocking file lock per job
+in ``state_dir`` lets only one worker run a job at a time. The job's state
+file records the schedule slot it last ran for, so the other workers skip
+that slot instead of running the job again right after. Results, last-run
+status and cumulative counters live next to the lock as JSON files, and every
+worker on the host serves the same snapshot. Without ``fcntl`` (Windows) locks
+only hold within one process.
+"""
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from serialization import neo4j_json_default
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+SCHEDULE_ALIASES = {
+    '@hourly': '0 * * * *',
+    '@daily': '0 0 * * *',
+    '@weekly': '0 0 * * 0',
+}
+
+_UNITS = {'s': 1, 'm': 60, 'h': 3600}
+
+
+def _parse_field(text, low, high):
+    """Expand one cron field (``*``, ``*/n``, ``a``, ``a-b``, ``a-b/n`` or lists) to a set."""
+    values = set()
+    for part in text.split(','):
+        span, _, step = part.partition('/')
+        step = int(step) if step else 1
+        if span == '*':
+            start, end = low, high
+        elif '-' in span:
+            start, end = (int(value) for value in span.split('-', 1))
+        else:
+            start = int(span)
+            end = high if '/' in part else start
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron field: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """
+    Five-field cron schedule (minute hour day month weekday), in local time.
+
+    Args:
+        expression (str): Cron expression; weekday 0 and 7 are both Sunday
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression needs 5 fields: {expression}")
+        self.expression = expression
+        self.minutes = _parse_field(fields[0], 0, 59)
+        self.hours = _parse_field(fields[1], 0, 23)
+        self.days = _parse_field(fields[2], 1, 31)
+        self.months = _parse_field(fields[3], 1, 12)
+        self.weekdays = {day % 7 for day in _parse_field(fields[4], 0, 7)}
+        # As in cron, a restricted day and weekday match if either one does
+        self._either_day = fields[2] != '*' and fields[4] != '*'
+
+    def _day_matches(self, moment):
+        day = moment.day in self.days
+        weekday = (moment.weekday() + 1) % 7 in self.weekdays
+        return (day or weekday) if self._either_day else (day and weekday)
+
+    def next_after(self, timestamp):
+        """UNIX time of the first matching minute strictly after ``timestamp``."""
+        moment = datetime.fromtimestamp(timestamp).replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = moment + timedelta(days=5 * 366)
+        while moment < limit:
+            if moment.month not in self.months:
+                moment = (moment.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+            elif not self._day_matches(moment):
+                moment = moment.replace(hour=0, minute=0) + timedelta(days=1)
+            elif moment.hour not in self.hours:
+                moment = moment.replace(minute=0) + timedelta(hours=1)
+            elif moment.minute not in self.minutes:
+                moment += timedelta(minutes=1)
+            else:
+                return moment.timestamp()
+        raise ValueError(f"Cron expression never matches: {self.expression}")
+
+
+class IntervalSchedule:
+    """
+    Fixed interval, aligned to the UNIX epoch so every worker agrees on the slots.
+
+    Args:
+        seconds (int): Interval length
+    """
+
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self.expression = f"@every {seconds}s"
+
+    def next_after(self, timestamp):
+        return (timestamp // self.seconds + 1) * self.seconds
+
+
+def parse_schedule(text):
+    """Build a schedule from a cron expression, an alias or ``@every <n>[s|m|h]``."""
+    text = text.strip()
+    if text.startswith('@every '):
+        value = text.split(None, 1)[1].strip()
+        unit = value[-1] if value[-1] in _UNITS else 's'
+        return IntervalSchedule(int(value.rstrip(''.join(_UNITS))) * _UNITS[unit])
+    return CronSchedule(SCHEDULE_ALIASES.get(text, text))
+
+
+class Job:
+    """A registered job and this process's counters for it."""
+
+    __slots__ = ('name', 'fn', 'schedule', 'next_run', 'running',
+                 'runs', 'failures', 'skipped', 'last_duration')
+
+    def __init__(self, name, fn, schedule):
+        self.name = name
+        self.fn = fn
+        self.schedule = schedule
+        self.next_run = None
+        self.running = False
+        self.runs = 0
+        self.failures = 0
+        self.skipped = 0
+        self.last_duration = None
+
+
+class Scheduler:
+    """
+    Cron-like job runner with a bounded worker pool and cross-process job locks.
+
+    Args:
+        state_dir (str): Directory for lock, state and result files, shared by
+            every worker on the host
+        max_workers (int): Jobs allowed to run at once in this process
+        tick_seconds (float): How often due jobs are checked
+    """
+
+    def __init__(self, state_dir, max_workers=2, tick_seconds=1.0):
+        os.makedirs(state_dir, exist_ok=True)
+        self.state_dir = state_dir
+        self.max_workers = max_workers
+        self.tick_seconds = tick_seconds
+        self._jobs = {}
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self._lock = threading.Lock()
+        self._local_locks = {}
+        self._queued = 0
+        self._results = {}
+        self._stop = threading.Event()
+        if fcntl is None:
+            logging.warning("fcntl is unavailable; job locks only hold within this process")
+
+    def _path(self, name, suffix):
+        return os.path.join(self.state_dir, f"{name}.{suffix}")
+
+    def add(self, name, fn, schedule):
+        """
+        Register a job.
+
+        Args:
+            name (str): Job name, also used for its state files
+            fn (callable): Runs the job; a non-None return value is stored as its result
+            schedule (str): Cron expression, alias or ``@every`` interval
+
+        Returns:
+            Job: The registered job
+        """
+        if name in self._jobs:
+            raise ValueError(f"Job '{name}' is already registered")
+        if not name or os.sep in name or '/' in name or name.startswith('.'):
+            raise ValueError(f"Job name '{name}' cannot be used as a file name")
+        job = self._jobs[name] = Job(name, fn, parse_schedule(schedule))
+        # A job that never ran anywhere runs right away; the state file then
+        # makes the other workers skip this catch-up run
+        if self._read_json(self._path(name, 'state.json')) is None:
+            job.next_run = 0
+        else:
+            job.next_run = job.schedule.next_after(time.time())
+        return job
+
+    def start(self):
+        """Dispatch due jobs from a daemon thread."""
+        def loop():
+            while not self._stop.wait(self.tick_seconds):
+                now = time.time()
+                for job in list(self._jobs.values()):
+                    if job.next_run <= now and not job.running:
+                        scheduled_for = job.next_run
+                        job.next_run = job.schedule.next_after(now)
+                        self._submit(job, scheduled_for)
+
+        thread = threading.Thread(target=loop, name='job-scheduler', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+        self._pool.shutdown(wait=False)
+
+    def run_now(self, name):
+        """
+        Queue a job outside its schedule.
+
+        Returns:
+            bool: False if the job is already running in this process
+        """
+        return self._submit(self._jobs[name], time.time(), force=True)
+
+    def _submit(self, job, scheduled_for, force=False):
+        with self._lock:
+            if job.running:
+                return False
+            job.running = True
+            self._queued += 1
+        self._pool.submit(self._run, job, scheduled_for, force)
+        return True
+
+    @contextmanager
+    def _job_lock(self, name):
+        """Hold the job's lock if no other worker does; yields whether it was acquired."""
+        if fcntl is None:
+            with self._lock:
+                lock = self._local_locks.setdefault(name, threading.Lock())
+            acquired = lock.acquire(blocking=False)
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    lock.release()
+            return
+        with open(self._path(name, 'lock'), 'a') as f:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                yield False
+                return
+            try:
+                yield True
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _run(self, job, scheduled_for, force):
+        with self._lock:
+            self._queued -= 1
+        try:
+            with self._job_lock(job.name) as acquired:
+                state_path = self._path(job.name, 'state.json')
+                state = self._read_json(state_path) or {'runs': 0, 'failures': 0}
+                if not acquired or (not force and state.get('last_scheduled', -1) >= scheduled_for):
+                    job.skipped += 1
+                    logging.debug(f"Skipping job {job.name}: {'locked' if not acquired else 'slot already ran'}")
+                    return
+                started = time.time()
+                state.update(last_scheduled=scheduled_for, last_started=started, worker=os.getpid())
+                try:
+                    result = job.fn()
+                    if result is not None:
+                        self._write_json(self._path(job.name, 'result.json'),
+                                         {'generated_at': time.time(), 'data': result})
+                    state.update(last_status='ok', last_error=None)
+                except Exception as e:
+                    job.failures += 1
+                    state['failures'] += 1
+                    state.update(last_status='failed', last_error=str(e))
+                    logging.error(f"Job {job.name} failed: {e}")
+                finally:
+                    finished = time.time()
+                    job.runs += 1
+                    job.last_duration = finished - started
+                    state['runs'] += 1
+                    state.update(last_finished=finished, last_duration_ms=round(job.last_duration * 1000, 1))
+                    self._write_json(state_path, state)
+        finally:
+            job.running = False
+
+    def result(self, name):
+        """
+        Latest stored result of a job, whichever worker produced it.
+
+        Returns:
+            dict: ``{'generated_at', 'data'}``, or None if the job has not succeeded yet
+        """
+        path = self._path(name, 'result.json')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        cached = self._results.get(name)
+        if cached is None or cached[0] != mtime:
+            cached = self._results[name] = (mtime, self._read_json(path))
+        return cached[1]
+
+    def status(self, name):
+        """Schedule, shared last-run state and this process's counters for a job."""
+        job = self._jobs[name]
+        state = self._read_json(self._path(name, 'state.json')) or {}
+        return {
+            'name': name,
+            'schedule': job.schedule.expression,
+            'next_run': job.next_run,
+            'running': job.running,
+            'last_status': state.get('last_status'),
+            'last_error': state.get('last_error'),
+            'last_started': state.get('last_started'),
+            'last_finished': state.get('last_finished'),
+            'last_duration_ms': state.get('last_duration_ms'),
+            'last_worker': state.get('worker'),
+            'runs': state.get('runs', 0),
+            'failures': state.get('failures', 0),
+            'local': {'runs': job.runs, 'failures': job.failures, 'skipped': job.skipped},
+        }
+
+    def metrics(self):
+        """Worker pool usage in this process."""
+        return {
+            'max_workers': self.max_workers,
+            'running': sum(job.running for job in self._jobs.values()) - self._queued,
+            'queued': self._queued,
+            'jobs': len(self._jobs),
+        }
+
+    @property
+    def jobs(self):
+        return list(self._jobs)
+
+    @staticmethod
+    def _read_json(path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            logging.warning(f"Ignoring corrupt job file {path}")
+            return None
+
+    @staticmethod
+    def _write_json(path, value):
+        """Replace the file atomically so readers never see a partial write."""
+        temp = f"{path}.{os.getpid()}.tmp"
+        with open(temp, 'w', encoding='utf-8') as f:
+            json.dump(value, f, default=neo4j_json_default, separators=(',', ':'))
+        os.replace(temp, path)
@@ -0,0 +1,107 @@
+# serialization.py
+"""
+Single-pass JSON serialization for Flask responses that carry Neo4j values.
+
+``Neo4jJSONProvider`` replaces Flask's default JSON provider, so every
+``jsonify`` call in the app goes through the same encoder. Neo4j temporal,
+spatial and graph types are handled by ``neo4j_json_default`` as the encoder
+meets them, instead of failing the first attempt and re-serializing the whole
+payload.
+
+When ``orjson`` is installed it is used as the backend; otherwise the standard
+library encoder is used. Output is compact unless ``JSON_COMPACT=false``.
+"""
+import json
+import os
+from datetime import date, datetime, time
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+from neo4j import Record
+from neo4j.graph import Node, Relationship, Path
+from neo4j.spatial import Point
+from neo4j.time import DateTime, Date, Time, Duration
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def neo4j_json_default(obj):
+    """
+    Convert a value the JSON encoder does not know natively.
+
+    Note that the standard library encoder turns tuple-backed driver types
+    (``Record``, ``Point``, ``Duration``) into arrays before this hook is
+    consulted; orjson routes them here. ``Neo4jConnection`` already returns
+    ``record.data()`` dicts, so records rarely reach the encoder.
+
+    Args:
+        obj: Value to convert
+
+    Returns:
+        A JSON-compatible value
+    """
+    if isinstance(obj, (DateTime, Date, Time, Duration)):
+        return obj.iso_format()
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (Node, Relationship)):
+        return dict(obj.items())
+    if isinstance(obj, Path):
+        return [dict(node.items()) for node in obj.nodes]
+    if isinstance(obj, Record):
+        return dict(obj.items())
+    if isinstance(obj, Point):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if hasattr(obj, '__dict__'):
+        return obj.__dict__
+    return str(obj)
+
+
+class Neo4jJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider with Neo4j-aware, optionally orjson-backed encoding."""
+
+    default = staticmethod(neo4j_json_default)
+    sort_keys = False
+
+    def __init__(self, app):
+        super().__init__(app)
+        # Read when the app is set up, after .env has been loaded
+        self.compact = os.getenv('JSON_COMPACT', 'true').lower() != 'false'
+
+    def _orjson_options(self, indent=False):
+        options = orjson.OPT_NON_STR_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        return options
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj to a JSON string."""
+        if orjson is not None and set(kwargs) <= {'indent', 'separators'}:
+            indent = bool(kwargs.get('indent'))
+            return orjson.dumps(obj, default=neo4j_json_default,
+                                option=self._orjson_options(indent)).decode()
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        """Serialize the arguments once and wrap them in a JSON response."""
+        obj = self._prepare_response_obj(args, kwargs)
+        pretty = self.compact is False or (self.compact is None and self._app.debug)
+
+        if orjson is not None:
+            body = orjson.dumps(obj, default=neo4j_json_default,
+                                option=self._orjson_options(pretty) | orjson.OPT_APPEND_NEWLINE)
+        elif pretty:
+            body = json.dumps(obj, default=neo4j_json_default, indent=2) + "\n"
+        else:
+            body = json.dumps(obj, default=neo4j_json_default, separators=(",", ":")) + "\n"
+
+        return self._app.response_class(body, mimetype=self.mimetype)
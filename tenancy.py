@@ -0,0 +1,175 @@
+# tenancy.py
+"""
+Multi-tenant campus routing.
+
+Each campus is a tenant with its own Neo4j database, and optionally its own
+server. A campus key is resolved per request, from the ``X-Campus`` header,
+the ``campus`` query parameter or the first label of the host name. It is
+stored on ``flask.g``. ``TenantRoutedConnection`` then sends every query
+to that campus's database, so a ``MATCH (other:Student)`` only
+sees one campus, and its cost scales with that campus alone.
+
+Tenants are configured with ``CAMPUSES``, a JSON object keyed by campus:
+
+    {"mit": {"database": "mit"},
+     "stanford": {"uri": "neo4j://stanford-db:7687", "database": "stanford"}}
+
+Missing ``uri``/``user``/``password`` fall back to ``NEO4J_*``. Tenants on the
+same server share one driver (and connection pool); tenants on different
+servers get their own. Without ``CAMPUSES`` there is a single ``default``
+campus on the server's default database.
+
+Caches and background engines that hold per-campus state are wrapped in
+``TenantScoped``, which keeps one instance per campus.
+"""
+import json
+import logging
+
+from flask import g, has_request_context, jsonify, request
+
+from db_connector import Neo4jConnection
+
+CAMPUS_HEADER = 'X-Campus'
+
+
+class TenantRegistry:
+    """
+    Campus keys and their database connections.
+
+    Args:
+        campuses (dict): ``{campus: {uri, user, password, database}}``
+        default_campus (str): Campus used when a request names none
+        defaults (dict): Fallback ``uri``/``user``/``password``
+        bookmarks: Bookmark holder shared by every campus connection
+    """
+
+    def __init__(self, campuses, default_campus, defaults, bookmarks=None):
+        if default_campus not in campuses:
+            raise ValueError(f"Default campus '{default_campus}' is not configured")
+        self.default = default_campus
+        self._connections = {}
+        self._drivers = {}
+        for campus, settings in campuses.items():
+            uri = settings.get('uri', defaults['uri'])
+            user = settings.get('user', defaults['user'])
+            password = settings.get('password', defaults['password'])
+            database = settings.get('database')
+            server = (uri, user)
+            if server not in self._drivers:
+                self._drivers[server] = Neo4jConnection(uri=uri, user=user, password=password,
+                                                        bookmarks=bookmarks)
+            self._connections[campus] = self._drivers[server].for_database(database)
+        logging.info(f"Configured campuses: {', '.join(self._connections)} "
+                     f"on {len(self._drivers)} server(s)")
+
+    @classmethod
+    def from_env(cls, campuses_json, default_campus, uri, user, password, bookmarks=None):
+        """Build a registry from the ``CAMPUSES`` setting."""
+        defaults = {'uri': uri, 'user': user, 'password': password}
+        if not campuses_json:
+            return cls({'default': {}}, 'default', defaults, bookmarks)
+        campuses = json.loads(campuses_json)
+        return cls(campuses, default_campus or next(iter(campuses)), defaults, bookmarks)
+
+    @property
+    def campuses(self):
+        return list(self._connections)
+
+    def __contains__(self, campus):
+        return campus in self._connections
+
+    def connection(self, campus):
+        return self._connections[campus]
+
+    def close(self):
+        for connection in self._drivers.values():
+            connection.close()
+
+
+def current_campus(registry):
+    """Campus of the current request, or the default outside a request."""
+    if has_request_context():
+        return g.get('campus', registry.default)
+    return registry.default
+
+
+def resolve_campus(registry):
+    """
+    Pick the campus for the current request.
+
+    Returns:
+        str: Campus key, or None if the request names an unknown campus
+    """
+    campus = request.headers.get(CAMPUS_HEADER) or request.args.get('campus')
+    if campus:
+        return campus if campus in registry else None
+    subdomain = request.host.split(':')[0].split('.')[0]
+    if subdomain in registry:
+        return subdomain
+    return registry.default
+
+
+def init_app(app, registry):
+    """Resolve the campus of every request before it is handled."""
+    @app.before_request
+    def bind_campus():
+        campus = resolve_campus(registry)
+        if campus is None:
+            return jsonify({'error': 'Unknown campus'}), 404
+        g.campus = campus
+
+
+class TenantRoutedConnection:
+    """
+    Drop-in for ``Neo4jConnection`` that routes to the current campus.
+
+    Background threads have no request; they use ``for_campus`` to get a
+    campus's connection explicitly.
+    """
+
+    def __init__(self, registry):
+        self.registry = registry
+
+    def for_campus(self, campus):
+        return self.registry.connection(campus)
+
+    def _current(self):
+        return self.registry.connection(current_campus(self.registry))
+
+    def run_query(self, query, parameters=None):
+        return self._current().run_query(query, parameters)
+
+    def execute_write_transaction(self, query, parameters=None):
+        return self._current().execute_write_transaction(query, parameters)
+
+    def execute_read_transaction(self, query, parameters=None):
+        return self._current().execute_read_transaction(query, parameters)
+
+    def close(self):
+        self.registry.close()
+
+
+class TenantScoped:
+    """
+    One instance of a component per campus.
+
+    Args:
+        registry (TenantRegistry): Configured campuses
+        factory (callable): ``factory(campus, connection)`` building an instance
+    """
+
+    def __init__(self, registry, factory):
+        self.registry = registry
+        self._instances = {campus: factory(campus, registry.connection(campus))
+                           for campus in registry.campuses}
+
+    @property
+    def current(self):
+        """Instance for the current request's campus."""
+        return self._instances[current_campus(self.registry)]
+
+    def get(self, campus):
+        return self._instances[campus]
+
+    def items(self):
+        return self._instances.items()
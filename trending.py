@@ -0,0 +1,197 @@
+# trending.py
+"""
+Time-decayed trending counters for courses and clubs.
+
+Each entity gets a ring buffer of per-bucket join counts (an ``array('I')``
+covering the sliding window, one hour per bucket by default). Recording a join
+is O(1). A background refresh turns the buffers into a ranked snapshot, where
+each bucket is weighted by ``0.5 ** (age / half_life)``. ``/api/trending``
+then only slices that snapshot, so a request never walks the counters.
+
+The graph is the source of truth: every ENROLLED_IN and MEMBER_OF relationship
+carries a ``created_at`` timestamp. ``rebuild`` recounts the window from those
+timestamps at startup and then periodically. A restart therefore does not
+reset what is trending, and each gunicorn worker converges on the joins the
+other workers recorded, without any shared state of its own.
+"""
+import logging
+import threading
+import time
+from array import array
+
+import queries
+
+# kind -> statement returning the kind's joins per time bucket
+TRENDING_KINDS = {
+    'course': queries.TRENDING_COURSE_JOINS,
+    'club': queries.TRENDING_CLUB_JOINS,
+}
+
+
+class _RingCounter:
+    """Per-bucket counts for one entity over the sliding window."""
+
+    __slots__ = ('counts', 'head', 'label')
+
+    def __init__(self, size, head, label=None):
+        self.counts = array('I', bytes(4 * size))
+        self.head = head
+        self.label = label
+
+    def advance(self, bucket):
+        """Move the ring forward to ``bucket``, zeroing buckets that fell out of the window."""
+        size = len(self.counts)
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+        for offset in range(1, min(steps, size) + 1):
+            self.counts[(self.head + offset) % size] = 0
+        self.head = bucket
+
+    def ordered(self):
+        """Counts from oldest to newest bucket."""
+        size = len(self.counts)
+        start = (self.head + 1) % size
+        return list(self.counts[start:]) + list(self.counts[:start])
+
+
+class TrendingEngine:
+    """
+    Sliding-window, exponentially decayed join counters.
+
+    Args:
+        window_buckets (int): Number of buckets in the window
+        bucket_seconds (int): Width of one bucket in seconds
+        half_life_buckets (float): Age in buckets at which a join counts half
+        top_n (int): Entities kept per kind in the ranked snapshot
+    """
+
+    def __init__(self, window_buckets=168, bucket_seconds=3600, half_life_buckets=24, top_n=50):
+        self.window_buckets = window_buckets
+        self.bucket_seconds = bucket_seconds
+        self.top_n = top_n
+        self._weights = [0.5 ** (age / half_life_buckets) for age in range(window_buckets)]
+        self._counters = {kind: {} for kind in TRENDING_KINDS}
+        self._snapshot = {kind: [] for kind in TRENDING_KINDS}
+        self._snapshot_at = None
+        self._dirty = True
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _bucket(self, now=None):
+        return int((now if now is not None else time.time()) // self.bucket_seconds)
+
+    def record(self, kind, key, label=None, now=None):
+        """
+        Count one join of ``key`` (a course code or club name).
+
+        Args:
+            kind (str): 'course' or 'club'
+            key (str): Entity key
+            label (str): Display name, if known
+            now (float): Event time as a UNIX timestamp; defaults to now
+        """
+        bucket = self._bucket(now)
+        with self._lock:
+            counter = self._counters[kind].get(key)
+            if counter is None:
+                counter = self._counters[kind][key] = _RingCounter(self.window_buckets, bucket, label)
+            counter.advance(bucket)
+            if label:
+                counter.label = label
+            age = counter.head - bucket
+            if 0 <= age < self.window_buckets:
+                counter.counts[bucket % self.window_buckets] += 1
+            self._dirty = True
+
+    def refresh(self, now=None):
+        """Rebuild the ranked snapshot from the counters."""
+        bucket = self._bucket(now)
+        with self._lock:
+            snapshot = {}
+            for kind, counters in self._counters.items():
+                ranked = []
+                stale = []
+                for key, counter in counters.items():
+                    counter.advance(bucket)
+                    ordered = counter.ordered()
+                    window_count = sum(ordered)
+                    if window_count == 0:
+                        stale.append(key)
+                        continue
+                    score = sum(count * self._weights[age]
+                                for age, count in enumerate(reversed(ordered)) if count)
+                    ranked.append({
+                        'key': key,
+                        'name': counter.label or key,
+                        'score': round(score, 3),
+                        'window_count': window_count,
+                    })
+                for key in stale:
+                    del counters[key]
+                ranked.sort(key=lambda entry: entry['score'], reverse=True)
+                snapshot[kind] = ranked[:self.top_n]
+            self._snapshot = snapshot
+            self._snapshot_at = time.time()
+            self._dirty = False
+
+    def trending(self, kind, limit=10):
+        """Return the top entities of a kind from the latest snapshot."""
+        return {
+            'kind': kind,
+            'window_hours': self.window_buckets * self.bucket_seconds / 3600,
+            'generated_at': self._snapshot_at,
+            'items': self._snapshot.get(kind, [])[:max(limit, 0)],
+        }
+
+    def rebuild(self, db, now=None):
+        """Replace the counters with the joins stored in the graph over the window."""
+        bucket = self._bucket(now)
+        params = {
+            'since': (bucket - self.window_buckets + 1) * self.bucket_seconds,
+            'bucket_seconds': self.bucket_seconds,
+        }
+        counters = {kind: {} for kind in TRENDING_KINDS}
+        for kind, query in TRENDING_KINDS.items():
+            for record in db.execute_read_transaction(query.cypher, params):
+                age = bucket - record['bucket']
+                if not 0 <= age < self.window_buckets:
+                    continue
+                counter = counters[kind].get(record['key'])
+                if counter is None:
+                    counter = counters[kind][record['key']] = _RingCounter(
+                        self.window_buckets, bucket, record['name'])
+                counter.counts[record['bucket'] % self.window_buckets] += record['joins']
+        with self._lock:
+            self._counters = counters
+        self.refresh(now)
+        logging.info(f"Trending counters rebuilt ({sum(len(c) for c in counters.values())} entities)")
+
+    def start(self, db, refresh_seconds=30, rebuild_seconds=300):
+        """
+        Refresh the snapshot and rebuild the counters from the graph from a daemon thread.
+
+        The first rebuild runs right away in that thread, and is retried every
+        ``refresh_seconds`` until it succeeds.
+        """
+        def loop():
+            last_rebuild = None
+            while True:
+                try:
+                    if last_rebuild is None or time.monotonic() - last_rebuild >= rebuild_seconds:
+                        self.rebuild(db)
+                        last_rebuild = time.monotonic()
+                    elif self._dirty or self._snapshot_at is None \
+                            or time.time() - self._snapshot_at >= self.bucket_seconds:
+                        self.refresh()
+                except Exception as e:
+                    logging.error(f"Trending maintenance failed: {e}")
+                if self._stop.wait(refresh_seconds):
+                    break
+
+        thread = threading.Thread(target=loop, name='trending-maintenance', daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,200 @@
+# warmup.py
+"""
+Cold-start warm-up and readiness probes.
+
+Right after a deploy the driver pool is empty, Neo4j has no plans cached for
+our statements, the hot part of the graph may not be in its page cache, and
+the application caches are empty. The first users would pay for all of it.
+
+``Warmer`` runs named warm-up steps in a background thread at startup and
+retries them with backoff until they all succeed. ``init_app`` adds two
+probes:
+
+- ``/healthz``: liveness. 200 while the process serves requests.
+- ``/readyz``: readiness. 503 until warm-up has finished, then 200.
+
+Point the load balancer at ``/readyz`` so it keeps traffic away from a cold
+instance, and the process supervisor at ``/healthz``.
+"""
+import logging
+import threading
+import time
+
+from flask import jsonify
+
+import queries
+
+
+class Warmer:
+    """
+    Ordered warm-up steps and the instance's readiness.
+
+    Args:
+        retry_seconds (float): Delay before retrying a failed warm-up
+        max_retry_seconds (float): Cap on the doubling retry delay
+    """
+
+    def __init__(self, retry_seconds=5, max_retry_seconds=60):
+        self.retry_seconds = retry_seconds
+        self.max_retry_seconds = max_retry_seconds
+        self.state = 'pending'
+        self.attempts = 0
+        self.started_at = time.time()
+        self.ready_at = None
+        self._steps = []
+        self._results = {}
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+
+    @property
+    def ready(self):
+        return self._ready.is_set()
+
+    def add(self, name, fn):
+        """
+        Register a step. ``fn()`` may return a dict of details for ``/readyz``.
+        """
+        self._steps.append((name, fn))
+        self._results[name] = {'status': 'pending'}
+
+    def run(self):
+        """Run every step once, in order; raises on the first failure."""
+        for name, fn in self._steps:
+            started = time.perf_counter()
+            self._results[name] = {'status': 'running'}
+            try:
+                details = fn()
+            except Exception as e:
+                self._results[name] = {'status': 'failed', 'error': str(e),
+                                       'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+                raise
+            self._results[name] = {'status': 'ok', 'details': details,
+                                   'duration_ms': round((time.perf_counter() - started) * 1000, 1)}
+
+    def _mark_ready(self):
+        self.state = 'ready'
+        self.ready_at = time.time()
+        self._ready.set()
+
+    def start(self):
+        """Warm up from a daemon thread, retrying until it succeeds."""
+        def loop():
+            delay = self.retry_seconds
+            while True:
+                self.attempts += 1
+                self.state = 'warming'
+                try:
+                    self.run()
+                except Exception as e:
+                    self.state = 'failed'
+                    logging.warning(f"Warm-up attempt {self.attempts} failed, retrying in {delay}s: {e}")
+                    if self._stop.wait(delay):
+                        return
+                    delay = min(delay * 2, self.max_retry_seconds)
+                    continue
+                self._mark_ready()
+                logging.info(f"Warm-up finished in {self.ready_at - self.started_at:.1f}s")
+                return
+
+        thread = threading.Thread(target=loop, name='warmup', daemon=True)
+        thread.start()
+        return thread
+
+    def skip(self):
+        """Report ready without warming up."""
+        self._mark_ready()
+
+    def stop(self):
+        self._stop.set()
+
+    def wait(self, timeout=None):
+        """Block until ready; returns whether it is."""
+        return self._ready.wait(timeout)
+
+    def status(self):
+        return {
+            'ready': self.ready,
+            'state': self.state,
+            'attempts': self.attempts,
+            'warmup_seconds': round(self.ready_at - self.started_at, 2) if self.ready_at else None,
+            'steps': dict(self._results),
+        }
+
+
+def init_app(app, warmer):
+    """Add the ``/healthz`` and ``/readyz`` probes."""
+    @app.route('/healthz', methods=['GET'])
+    def healthz():
+        """Liveness: the process is up and serving requests."""
+        return jsonify({'status': 'ok', 'uptime_seconds': round(time.time() - warmer.started_at, 1)}), 200
+
+    @app.route('/readyz', methods=['GET'])
+    def readyz():
+        """Readiness: 200 only once warm-up has finished."""
+        return jsonify(warmer.status()), 200 if warmer.ready else 503
+
+
+# Statements priming runs: the per-student, per-course and per-club lookups
+# behind most requests. Each one starts from an index seek and stays bounded.
+# Schema, statistics and leaderboard scans are left out on purpose: they are
+# served from the job snapshots, and running them in every worker on every
+# deploy would load the database the way admission control exists to prevent.
+HOT_QUERIES = (
+    queries.GET_STUDENT,
+    queries.STUDENT_SUMMARIES,
+    queries.STUDENT_FOLLOWING,
+    queries.STUDENT_FOLLOWERS,
+    queries.SEARCH_NEIGHBORS,
+    queries.COURSE_STUDENTS,
+    queries.CLUB_MEMBERS,
+)
+
+
+def hot_entities(db, limit, leaderboard=None):
+    """
+    The students, courses and clubs most requests are about.
+
+    Args:
+        db: Connection to one campus database
+        limit (int): Entities per kind
+        leaderboard (dict): The campus's ``leaderboards`` job result, if one
+            exists; used instead of running the leaderboard scans again
+
+    Returns:
+        dict: ``{students, courses, clubs}`` keys, most popular first
+    """
+    if leaderboard is None:
+        leaderboard = {
+            'most_followed': db.execute_read_transaction(queries.MOST_FOLLOWED.cypher, {'limit': limit}),
+            'courses': db.execute_read_transaction(queries.POPULAR_COURSES.cypher, {'limit': limit}),
+            'clubs': db.execute_read_transaction(queries.LARGEST_CLUBS.cypher, {'limit': limit}),
+        }
+    return {
+        'students': [record['student_id'] for record in leaderboard['most_followed'][:limit]],
+        'courses': [record['c']['code'] for record in leaderboard['courses'][:limit]],
+        'clubs': [record['c']['name'] for record in leaderboard['clubs'][:limit]],
+    }
+
+
+def prime_queries(db, hot):
+    """
+    Run each of ``HOT_QUERIES`` once, so Neo4j plans and caches it and pulls
+    the data it touches into its page cache.
+
+    Statements are parameterized with the hottest entities where possible.
+
+    Returns:
+        dict: Number of statements run
+    """
+    sample = {'ids': hot['students']}
+    if hot['students']:
+        sample['student_id'] = hot['students'][0]
+    if hot['courses']:
+        sample['course_code'] = hot['courses'][0]
+    if hot['clubs']:
+        sample['club_name'] = hot['clubs'][0]
+
+    for query in HOT_QUERIES:
+        params = {key: sample.get(key, default) for key, default in query.params.items()}
+        db.execute_read_transaction(query.cypher, params)
+    return {'statements': len(HOT_QUERIES)}